@@ -1,241 +1,88 @@
 #!/usr/bin/env python3
 
-from models import db, Guest, Rooms, Reservation, User
-from flask_migrate import Migrate
-from flask import Flask, request, make_response, jsonify
-from werkzeug.security import check_password_hash
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from models import db
+from engines import bind_config, init_engines
+from metrics import init_metrics
+from encoding import init_encoding
+from views import register_blueprints
+from flask import Flask
+import click
+from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 import os
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-DATABASE = os.environ.get("DB_URI", f"sqlite:///{os.path.join(BASE_DIR, 'hotel.db')}")
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = os.environ.get("JWT_SECRET_KEY", "super-secret-key")
-CORS(app)
-# Initialize JWT
-jwt = JWTManager(app)
+jwt = JWTManager()
+
+
+def default_config():
+    """Settings read from the environment when the app is created."""
+    return {
+        'SQLALCHEMY_DATABASE_URI': os.environ.get("DB_URI", f"sqlite:///{os.path.join(BASE_DIR, 'hotel.db')}"),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        # GET/HEAD requests read from DB_REPLICA_URI (or a read-only pool on the SQLite file)
+        'DB_REPLICA_URI': os.environ.get("DB_REPLICA_URI"),
+        # Connections each pool keeps per process; gunicorn.conf.py sets it to the thread count
+        'DB_POOL_SIZE': int(os.environ.get("DB_POOL_SIZE", 5)),
+        'DB_MAX_OVERFLOW': int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        # Set METRICS_DIR to a directory shared by all workers to aggregate /metrics across them
+        'METRICS_DIR': os.environ.get("METRICS_DIR"),
+        # /metrics answers these networks without a token, anyone else with an admin token
+        'METRICS_ALLOWED_NETWORKS': os.environ.get("METRICS_ALLOWED_NETWORKS", "127.0.0.0/8,::1/128"),
+        'JWT_SECRET_KEY': os.environ.get("JWT_SECRET_KEY", "super-secret-key"),
+        # Password hashing runs on a bounded pool; 0 workers hashes inline on the request thread
+        'HASH_POOL_WORKERS': int(os.environ.get("HASH_POOL_WORKERS", max(1, (os.cpu_count() or 2) // 2))),
+        'HASH_POOL_QUEUE_SIZE': int(os.environ.get("HASH_POOL_QUEUE_SIZE", 16)),
+        'PASSWORD_HASH_METHOD': os.environ.get("PASSWORD_HASH_METHOD", "scrypt"),
+        # Response encoding: JSON_BACKEND is "orjson" (when installed) or "json"; bodies from
+        # COMPRESS_MIN_SIZE bytes up are gzip/deflate/br compressed when the client accepts it
+        'JSON_BACKEND': os.environ.get("JSON_BACKEND"),
+        'COMPRESS_MIN_SIZE': int(os.environ.get("COMPRESS_MIN_SIZE", 1024)),
+        'COMPRESS_LEVEL': int(os.environ.get("COMPRESS_LEVEL", 6)),
+        # Booking emails are sent by `flask worker`; without MAIL_SERVER they are only logged
+        'MAIL_SERVER': os.environ.get("MAIL_SERVER"),
+        'MAIL_PORT': int(os.environ.get("MAIL_PORT", 25)),
+        'MAIL_SENDER': os.environ.get("MAIL_SENDER", "reservations@localhost"),
+    }
+
+
+def init_cli(app):
+    # Flask-Migrate pulls in alembic and the commands pull in the worker,
+    # none of which a server process needs, so only load them for `flask ...`
+    if click.get_current_context(silent=True) is None:
+        return
+    from flask_migrate import Migrate
+    from cli import register_commands
+    Migrate(app, db)
+    register_commands(app)
+
+
+def create_app(config=None):
+    """Build the app; `config` overrides the settings read from the environment."""
+    app = Flask(__name__)
+    app.config.update(default_config())
+    app.config.update(config or {})
+    if 'SQLALCHEMY_ENGINE_OPTIONS' not in app.config:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'], app.config['SQLALCHEMY_BINDS'] = bind_config(
+            app.config['SQLALCHEMY_DATABASE_URI'], app.config['DB_REPLICA_URI'],
+            app.config['DB_POOL_SIZE'], app.config['DB_MAX_OVERFLOW'])
+    CORS(app)
+    jwt.init_app(app)
+    db.init_app(app)
+    init_engines(app, db)
+    init_metrics(app)
+    init_encoding(app)
+    register_blueprints(app)
+    app.add_url_rule('/', 'index', index)
+    init_cli(app)
+    return app
 
-# Initialize SQLAlchemy
-db.init_app(app)
 
-# Initialize Flask-Migrate after db is initialized
-migrate = Migrate(app, db)
-
-@app.route('/')
 def index():
     return '<h1>Welcome to Hotel Management System</h1>'
 
-# User Registration (Admin only)
-@app.route('/register', methods=['POST'])
-# @jwt_required()
-def register_user():
-    # current_user = get_jwt_identity()
-    # user = User.query.filter_by(username=current_user).first()
-    
-    # Check if current user is an admin
-    # if user.role != 'admin':
-    #     return jsonify({"error": "Only admins can register new users"}), 403
-
-    data = request.get_json()
-    username = data.get('username')
-    password = data.get('password')
-    role = data.get('role','user')
-
-    if not username or not password or not role:
-        return jsonify({"error": "Missing data"}), 400
-
-    if User.query.filter_by(username=username).first():
-        return jsonify({"error": "Username already exists"}), 400
-
-    new_user = User(username=username, role=role)
-    new_user.set_password(password)
-
-    db.session.add(new_user)
-    db.session.commit()
-
-    return jsonify({"message": "User created successfully"}), 201
-
-# User Login
-@app.route('/login', methods=['POST'])
-def login():
-    data = request.get_json()
-    username = data.get('username')
-    password = data.get('password')
-
-    user = User.query.filter_by(username=username).first()
-
-    if not user or not check_password_hash(user.password_hash, password):
-        return jsonify({"error": "Invalid username or password"}), 401
-
-    access_token = create_access_token(identity=username)
-    return jsonify(access_token=access_token), 200
-
-# CRUD for Guests
-@app.route('/guests', methods=['GET'])
-@jwt_required()
-def get_guests():
-    guests = Guest.query.all()
-    response_data = [guest.to_dict() for guest in guests]
-    return make_response(jsonify(response_data), 200)
-
-@app.route('/guests/<int:id>', methods=['GET'])
-@jwt_required()
-def get_guest(id):
-    guest = db.session.get(Guest, id)
-    if guest:
-        return make_response(jsonify(guest.to_dict()), 200)
-    return jsonify({'error': 'Guest not found'}), 404
-
-@app.route('/guests', methods=['POST'])
-@jwt_required()
-def create_guest():
-    data = request.get_json()
-    # print("getting data...",data)
-    try:
-        new_guest = Guest(
-            name=data['name'],
-            email=data['email'],
-            phone=data['phone']
-        )
-        db.session.add(new_guest)
-        db.session.commit()
-        return make_response(jsonify(new_guest.to_dict()), 201)
-    except Exception as e:
-        # print("Getting error",str(e))
-        return jsonify({'error': str(e)}), 400
-
-@app.route('/guests/<int:id>', methods=['PATCH'], endpoint='update_guest')
-@jwt_required()
-def update_guest(id):
-    guest = db.session.get(Guest, id)
-    if not guest:
-        return jsonify({'error': 'Guest not found'}), 404
-
-    data = request.get_json()
-    if 'name' in data:
-        guest.name = data['name']
-    if 'email' in data:
-        try:
-            guest.email = data['email']
-        except ValueError as e:
-            return jsonify({'error': str(e)}), 400
-    if 'phone' in data:
-        try:
-            guest.phone = data['phone']
-        except ValueError as e:
-            return jsonify({'error': str(e)}), 400
-
-    db.session.commit()
-    return make_response(jsonify(guest.to_dict()), 200)
-
-@app.route('/guests/<int:id>', methods=['DELETE'])
-@jwt_required()
-def delete_guest(id):
-    guest = db.session.get(Guest, id)
-    if not guest:
-        return jsonify({'error': 'Guest not found'}), 404
-    db.session.delete(guest)
-    db.session.commit()
-    return make_response({'message': 'Guest deleted'}, 202)
-
-# CRUD for Rooms
-@app.route('/rooms', methods=['GET'])
-@jwt_required()
-def get_all():
-    rooms = Rooms.query.all()
-    return jsonify([room.to_dict() for room in rooms])
-@jwt_required()
-def get_rooms():
-    rooms = Rooms.query.all()
-    response_data = [room.to_dict() for room in rooms]
-    return make_response(jsonify(response_data), 200)
-
-@app.route('/rooms/<int:id>', methods=['GET'])
-@jwt_required()
-def get_room(id):
-    room = db.session.get(Rooms, id)
-    if room:
-        return jsonify(room.to_dict()), 200
-    return jsonify({'error': 'Room not found'}), 404
-
-@app.route('/rooms', methods=['POST'])
-@jwt_required()
-def create_room():
-    data = request.get_json()
-    try:
-        new_room = Rooms(
-            room_number=data['room_number'],
-            room_type=data['room_type'],
-            price_per_night=data['price_per_night'],
-            status=data['status']
-        )
-        db.session.add(new_room)
-        db.session.commit()
-        return make_response(jsonify(new_room.to_dict()), 201)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 400
-
-@app.route('/rooms/<int:id>', methods=['DELETE'])
-@jwt_required()
-def delete_room(id):
-    room = db.session.get(Rooms, id)
-    if not room:
-        return jsonify({'error': 'Room not found'}), 404
-    db.session.delete(room)
-    db.session.commit()
-    return make_response({'message': 'room deleted successfully'}, 202)
-
-# CRUD for Reservations
-@app.route('/reservations', methods=['GET'])
-@jwt_required()
-def get_reservations():
-    reservations = Reservation.query.all()
-    response_data = [reservation.to_dict() for reservation in reservations]
-    print(response_data)
-    return make_response(jsonify(response_data), 200)
-
-@app.route('/reservations/<int:id>', methods=['GET'])
-@jwt_required()
-def get_reservation(id):
-    reservation = db.session.get(Reservation, id)
-    if reservation:
-        return jsonify(reservation.to_dict()), 200
-    return jsonify({'error': 'Reservation not found'}), 404
-
-@app.route('/reservations', methods=['POST'])
-@jwt_required()
-def create_reservation():
-    data = request.get_json()
-    # print("Incoming data..",data)
-    try:
-        new_reservation = Reservation(
-            check_in_date=data['check_in_date'],
-            check_out_date=data['check_out_date'],
-            total_price=data['total_price'],
-            guest_id=data['guest_id'],
-            room_id=data['room_id']
-        )
-        db.session.add(new_reservation)
-        db.session.commit()
-        return make_response(jsonify(new_reservation.to_dict()), 201)
-    except Exception as e:
-        # print("Here is the Error",str(e))
-        return jsonify({'error': str(e)}), 400
-
-@app.route('/reservations/<int:id>', methods=['DELETE'])
-@jwt_required()
-def delete_reservation(id):
-    reservation = db.session.get(Reservation, id)
-    if not reservation:
-        return jsonify({'error': 'Reservation not found'}), 404
-    db.session.delete(reservation)
-    db.session.commit()
-    return make_response({'message': 'Reservation successfully deleted'}, 202)
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5555)) 
-    app.run(host="0.0.0.0", port=port,debug=True)
\ No newline at end of file
+    port = int(os.environ.get("PORT", 5555))
+    create_app().run(host="0.0.0.0", port=port, debug=True)
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from models import db, Rooms, Reservation, ArchivedReservation
+from response_cache import bump_version
+from serializers import DATETIME_FORMAT
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 365
+DEFAULT_BATCH_SIZE = 1000
+
+STAY_COLUMNS = ('id', 'check_in_date', 'check_out_date', 'total_price', 'guest_id', 'room_id', 'created_at')
+
+
+def archive_cutoff(days=None):
+    """Stays that checked out before this are moved to the archive."""
+    if days is None:
+        days = current_app.config.get('ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    return datetime.now() - timedelta(days=days)
+
+
+def archive_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """Move up to `batch_size` stays that ended before `cutoff` into the archive, in one transaction.
+
+    Returns how many were moved. A batch is all or nothing, so an
+    interrupted run just picks up where it stopped when run again.
+    """
+    # Reservation ids are never reused (AUTOINCREMENT on SQLite), so an
+    # archived id can't come back as a new booking
+    ids = db.session.execute(
+        db.select(Reservation.id)
+        .where(Reservation.check_out_date < cutoff)
+        .order_by(Reservation.id)
+        .limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        return 0
+    try:
+        db.session.execute(db.insert(ArchivedReservation).from_select(
+            [*STAY_COLUMNS, 'room_type', 'archived_at'],
+            db.select(*(getattr(Reservation, c) for c in STAY_COLUMNS), Rooms.room_type, db.literal(datetime.now()))
+            .outerjoin(Rooms, Reservation.room_id == Rooms.id)
+            .where(Reservation.id.in_(ids)),
+        ))
+        db.session.execute(db.delete(Reservation).where(Reservation.id.in_(ids)))
+        bump_version('reservations')
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(ids)
+
+
+def archive(cutoff, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """Archive stays that ended before `cutoff` batch by batch; yields the running total after each."""
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            return
+        total += moved
+        batches += 1
+        yield total
+
+
+def archived_through():
+    """Latest check-out among archived stays, or None when nothing is archived."""
+    return db.session.execute(db.select(db.func.max(ArchivedReservation.check_out_date))).scalar()
+
+
+def _stays(model, start, end, guest_id):
+    query = db.select(
+        *(getattr(model, c) for c in STAY_COLUMNS),
+        db.literal(model is ArchivedReservation).label('archived'),
+    )
+    if guest_id is not None:
+        query = query.where(model.guest_id == guest_id)
+    if start is not None:
+        query = query.where(model.check_out_date > start)
+    if end is not None:
+        query = query.where(model.check_in_date < end)
+    return query
+
+
+def stays_query(start=None, end=None, guest_id=None):
+    """Stays overlapping [start, end), oldest first.
+
+    Reads the hot table, and unions in the archive only when the range
+    reaches back to before its newest stay.
+    """
+    query = _stays(Reservation, start, end, guest_id)
+    boundary = archived_through()
+    if boundary is not None and (start is None or start < boundary):
+        query = query.union_all(_stays(ArchivedReservation, start, end, guest_id))
+    stays = query.subquery()
+    return db.select(stays).order_by(stays.c.check_in_date, stays.c.id)
+
+
+def guest_history(guest_id, start=None, end=None):
+    return [
+        {
+            **{c: getattr(row, c) for c in ('id', 'total_price', 'guest_id', 'room_id')},
+            'check_in_date': row.check_in_date.strftime(DATETIME_FORMAT),
+            'check_out_date': row.check_out_date.strftime(DATETIME_FORMAT),
+            'archived': bool(row.archived),
+        }
+        for row in db.session.execute(stays_query(start, end, guest_id))
+    ]
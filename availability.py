@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from models import db, Rooms, Reservation
+
+DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+
+
+def parse_date(value, name):
+    if not value:
+        raise ValueError(f'{name} is required')
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            pass
+    raise ValueError(f'Invalid date format for {name}. Expected YYYY-MM-DD or YYYY-MM-DD HH:MM:SS.')
+
+
+def parse_range(check_in, check_out):
+    check_in = parse_date(check_in, 'check_in')
+    check_out = parse_date(check_out, 'check_out')
+    if check_out <= check_in:
+        raise ValueError('check_out must be after check_in')
+    return check_in, check_out
+
+
+def overlapping(room_id, check_in, check_out):
+    # Two stays overlap when each starts before the other ends; checking out
+    # on the day the next guest checks in is not a conflict. room_id first
+    # keeps this on ix_reservations_room_dates.
+    return db.and_(
+        Reservation.room_id == room_id,
+        Reservation.check_in_date < check_out,
+        Reservation.check_out_date > check_in,
+    )
+
+
+def is_booked(room_id, check_in, check_out, exclude_id=None):
+    query = db.select(Reservation.id).where(overlapping(room_id, check_in, check_out))
+    if exclude_id is not None:
+        query = query.where(Reservation.id != exclude_id)
+    return db.session.execute(query.limit(1)).first() is not None
+
+
+def available_rooms_query(check_in, check_out, room_type=None):
+    booked = db.select(Reservation.id).where(overlapping(Rooms.id, check_in, check_out))
+    query = (
+        db.select(Rooms)
+        .where(Rooms.status != 'under_maintenance', ~booked.exists())
+        .order_by(Rooms.room_number)
+    )
+    if room_type:
+        query = query.where(Rooms.room_type == room_type)
+    return query
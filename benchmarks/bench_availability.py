@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Time /rooms/available-style lookups and booking overlap checks.
+
+Run from the repository root:  python benchmarks/bench_availability.py [reservations]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import db, Guest, Rooms, Reservation
+from availability import available_rooms_query, is_booked
+
+ROOMS = 1000
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(count):
+    start = datetime(2025, 1, 1)
+    db.session.execute(db.insert(Rooms), [
+        dict(id=i, room_number=i, room_type=('single', 'double', 'suite')[i % 3],
+             price_per_night=50, status='available', image='')
+        for i in range(1, ROOMS + 1)
+    ])
+    db.session.execute(db.insert(Guest), [dict(id=1, name='Guest', email='g@example.com', phone='0' * 12)])
+    rows = []
+    per_room = count // ROOMS
+    for room_id in range(1, ROOMS + 1):
+        day = start
+        for _ in range(per_room):
+            day += timedelta(days=random.randint(0, 3))
+            nights = random.randint(1, 5)
+            rows.append(dict(check_in_date=day, check_out_date=day + timedelta(days=nights),
+                             total_price=50 * nights, guest_id=1, room_id=room_id))
+            day += timedelta(days=nights)
+    db.session.execute(db.insert(Reservation), rows)
+    db.session.commit()
+    return start, day
+
+
+def timed(label, fn, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f'{label:<40} {elapsed * 1000:8.2f} ms')
+
+
+def main(count):
+    app = build_app()
+    with app.app_context():
+        db.create_all()
+        first, last = seed(count)
+        print(f'{ROOMS} rooms, {count} reservations')
+        span = (last - first).days
+
+        def window():
+            check_in = first + timedelta(days=random.randint(0, span))
+            return check_in, check_in + timedelta(days=random.randint(1, 7))
+
+        timed('available rooms (any type)',
+              lambda: db.session.execute(available_rooms_query(*window())).scalars().all(), 20)
+        timed('available rooms (suite)',
+              lambda: db.session.execute(available_rooms_query(*window(), 'suite')).scalars().all(), 20)
+        timed('overlap check for one room',
+              lambda: is_booked(random.randint(1, ROOMS), *window()))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Stress POST /reservations from many threads and check that no room is ever double-booked.
+
+Threads book random short stays over a few weeks on a handful of rooms,
+so most requests contend for the same rooms and many must get a 409.
+Afterwards every pair of reservations is checked for overlap.
+
+Run from the repository root:  python benchmarks/bench_booking.py [threads] [bookings per thread] [rooms]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DB_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models import db, Guest, Rooms, Reservation
+
+app = create_app()
+
+DAYS = 21
+FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def setup(rooms):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(db.insert(Rooms), [
+            dict(id=i, room_number=100 + i, room_type='single', price_per_night=50, status='available', image='')
+            for i in range(1, rooms + 1)
+        ])
+        db.session.execute(db.insert(Guest), [dict(id=1, name='Guest', email='g@example.com', phone='0' * 12)])
+        db.session.commit()
+        return create_access_token(identity='bench', additional_claims={'role': 'admin'})
+
+
+def worker(token, count, rooms, seed, statuses, latencies, lock):
+    rng = random.Random(seed)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    start_day = datetime.now().replace(hour=14, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    for _ in range(count):
+        check_in = start_day + timedelta(days=rng.randrange(DAYS))
+        check_out = check_in + timedelta(days=rng.randint(1, 3))
+        body = {
+            'check_in_date': check_in.strftime(FORMAT),
+            'check_out_date': check_out.strftime(FORMAT),
+            'guest_id': 1,
+            'room_id': rng.randint(1, rooms),
+        }
+        started = time.perf_counter()
+        status = client.post('/reservations', json=body, headers=headers).status_code
+        elapsed = time.perf_counter() - started
+        with lock:
+            statuses[status] += 1
+            latencies.append(elapsed)
+
+
+def double_bookings():
+    with app.app_context():
+        other = db.aliased(Reservation)
+        return db.session.execute(
+            db.select(db.func.count()).select_from(Reservation).join(other, db.and_(
+                other.room_id == Reservation.room_id,
+                other.id > Reservation.id,
+                other.check_in_date < Reservation.check_out_date,
+                other.check_out_date > Reservation.check_in_date,
+            ))
+        ).scalar()
+
+
+def main(threads, per_thread, rooms):
+    token = setup(rooms)
+    statuses, latencies, lock = Counter(), [], threading.Lock()
+    pool = [
+        threading.Thread(target=worker, args=(token, per_thread, rooms, seed, statuses, latencies, lock))
+        for seed in range(threads)
+    ]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = threads * per_thread
+    print(f'{threads} threads x {per_thread} bookings on {rooms} rooms over {DAYS} days')
+    print(f'  {total / elapsed:.0f} requests/s, p50 {latencies[total // 2] * 1000:.1f} ms, '
+          f'p99 {latencies[int(total * 0.99)] * 1000:.1f} ms')
+    print(f'  statuses: {dict(sorted(statuses.items()))}')
+    overlaps = double_bookings()
+    print(f'  double bookings: {overlaps}')
+    if overlaps or set(statuses) - {201, 409, 503}:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [16, 50, 5][len(args):]))
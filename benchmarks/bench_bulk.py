@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Import guests and reservations through the /bulk endpoints at a few chunk sizes.
+
+Reports rows/s for each endpoint, as a JSON array and as NDJSON, on a fresh
+database every run.
+
+Run from the repository root:  python benchmarks/bench_bulk.py [rows] [chunk sizes, comma-separated]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DB_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models import db, Rooms, ROOM_TYPES
+
+app = create_app()
+ROOMS = 100
+PRICE = 80
+
+
+def setup():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(db.insert(Rooms), [
+            dict(id=i, room_number=100 + i, room_type=ROOM_TYPES[i % 3], price_per_night=PRICE,
+                 status='available', image='')
+            for i in range(1, ROOMS + 1)
+        ])
+        db.session.commit()
+        return create_access_token(identity='bench', additional_claims={'role': 'admin'})
+
+
+def guests(count):
+    return [
+        {'name': f'Guest {i}', 'email': f'guest{i}@example.com', 'phone': f'{254700000000 + i}'}
+        for i in range(count)
+    ]
+
+
+def reservations(count):
+    # Back-to-back two-night stays, spread over the rooms so none overlap
+    start = datetime(2030, 1, 1, 14)
+    rows = []
+    for i in range(count):
+        check_in = start + timedelta(days=i // ROOMS * 2)
+        rows.append({
+            'guest_id': i + 1,
+            'room_id': i % ROOMS + 1,
+            'check_in_date': check_in.strftime('%Y-%m-%d %H:%M:%S'),
+            'check_out_date': (check_in + timedelta(days=2)).strftime('%Y-%m-%d %H:%M:%S'),
+            'total_price': PRICE * 2,
+        })
+    return rows
+
+
+def run(client, headers, path, rows, chunk_size, ndjson):
+    if ndjson:
+        body = {'data': '\n'.join(json.dumps(row) for row in rows), 'content_type': 'application/x-ndjson'}
+    else:
+        body = {'json': rows}
+    started = time.perf_counter()
+    response = client.post(f'{path}?chunk_size={chunk_size}', headers=headers, **body)
+    elapsed = time.perf_counter() - started
+    result = response.get_json()
+    assert response.status_code == 201 and result['inserted'] == len(rows), result.get('errors', result)[:3]
+    return len(rows) / elapsed
+
+
+def main(count, chunk_sizes):
+    client = app.test_client()
+    for chunk_size in chunk_sizes:
+        for ndjson in (False, True):
+            headers = {'Authorization': f'Bearer {setup()}'}
+            label = f"chunk_size={chunk_size} {'ndjson' if ndjson else 'json'}"
+            guest_rate = run(client, headers, '/guests/bulk', guests(count), chunk_size, ndjson)
+            reservation_rate = run(client, headers, '/reservations/bulk', reservations(count), chunk_size, ndjson)
+            print(f'{label}: guests {guest_rate:.0f} rows/s, reservations {reservation_rate:.0f} rows/s ({count} rows)')
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sizes = [int(size) for size in sys.argv[2].split(',')] if len(sys.argv) > 2 else [100, 1000, 5000]
+    main(count, sizes)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Mixed read/write throughput on SQLite: default engine vs. the tuned primary/replica pair.
+
+Readers list rooms with their upcoming reservations while writers insert
+reservations, all on one database file, for a fixed duration per profile.
+
+Run from the repository root:  python benchmarks/bench_concurrency.py [seconds] [readers] [writers]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select, func
+from sqlalchemy.exc import OperationalError
+from engines import bind_config, tune_engine, REPLICA_BIND
+from models import db, Guest, Rooms, Reservation
+
+ROOMS = 200
+
+
+def setup(path):
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Rooms), [
+            dict(id=i, room_number=i, room_type='single', price_per_night=50, status='available', image='')
+            for i in range(1, ROOMS + 1)
+        ])
+        conn.execute(insert(Guest), [dict(id=1, name='Guest', email='g@example.com', phone='0' * 12)])
+    engine.dispose()
+
+
+def default_profile(uri):
+    engine = create_engine(uri)
+    return engine, engine
+
+
+def tuned_profile(uri):
+    options, binds = bind_config(uri)
+    primary = create_engine(uri, **options)
+    replica_options = dict(binds[REPLICA_BIND])
+    replica = create_engine(replica_options.pop('url'), **replica_options)
+    tune_engine(primary)
+    tune_engine(replica)
+    return primary, replica
+
+
+def run(label, profile, uri, seconds, readers, writers):
+    primary, replica = profile(uri)
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    start_day = datetime(2030, 1, 1)
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def reader():
+        query = (
+            select(Rooms.id, Rooms.room_number, func.count(Reservation.id))
+            .outerjoin(Reservation, Reservation.room_id == Rooms.id)
+            .group_by(Rooms.id)
+        )
+        while not stop.is_set():
+            try:
+                with replica.connect() as conn:
+                    conn.execute(query).all()
+                bump('reads')
+            except OperationalError:
+                bump('errors')
+
+    def writer(n):
+        i = 0
+        while not stop.is_set():
+            day = start_day + timedelta(days=i * 7 + n * 100000)
+            i += 1
+            try:
+                with primary.begin() as conn:
+                    conn.execute(insert(Reservation), [dict(
+                        check_in_date=day, check_out_date=day + timedelta(days=2), total_price=100,
+                        guest_id=1, room_id=i % ROOMS + 1,
+                    )])
+                bump('writes')
+            except OperationalError:
+                bump('errors')
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    print(f"{label:<10} reads/s {counts['reads'] / seconds:9.0f}  writes/s {counts['writes'] / seconds:9.0f}  "
+          f"lock errors {counts['errors']}")
+    primary.dispose()
+    replica.dispose()
+
+
+def main(seconds, readers, writers):
+    print(f'{readers} readers, {writers} writers, {seconds}s per profile')
+    for label, profile in (('default', default_profile), ('tuned', tuned_profile)):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        setup(path)
+        run(label, profile, f'sqlite:///{path}', seconds, readers, writers)
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [5, 8, 2][len(args):]))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Bytes on the wire and encode CPU per response for each JSON backend, body format and coding.
+
+Payloads are pages of the detail views, as GET /reservations and
+GET /rooms?include=reservations.guests return them.
+
+Run from the repository root:  python benchmarks/bench_encoding.py [page size]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import db, Guest, Rooms, Reservation
+from serializers import get_plan
+from encoding import JSON_BACKENDS, EncodingJSONProvider, brotli, compress, msgpack
+
+ROOMS = 100
+GUESTS = 2000
+RESERVATIONS = 20000
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed():
+    now = datetime.now()
+    db.session.execute(db.insert(Rooms), [
+        dict(id=i, room_number=100 + i, room_type='double', price_per_night=80, status='available',
+             image='https://images.unsplash.com/photo-1618773928121-c32242e63f39?q=80&w=1470&auto=format&fit=crop',
+             created_at=now)
+        for i in range(1, ROOMS + 1)
+    ])
+    db.session.execute(db.insert(Guest), [
+        dict(id=i, name=f'Guest {i}', email=f'guest{i}@example.com', phone=f'{254700000000 + i}', created_at=now)
+        for i in range(1, GUESTS + 1)
+    ])
+    db.session.execute(db.insert(Reservation), [
+        dict(id=i, check_in_date=now + timedelta(days=i // ROOMS * 3),
+             check_out_date=now + timedelta(days=i // ROOMS * 3 + 2), total_price=160,
+             guest_id=i % GUESTS + 1, room_id=i % ROOMS + 1, created_at=now)
+        for i in range(1, RESERVATIONS + 1)
+    ])
+    db.session.commit()
+
+
+def payload(model, limit):
+    plan = get_plan(model)
+    query = db.select(model).options(*plan.load_options()).order_by(model.id).limit(limit)
+    return [plan(row) for row in db.session.execute(query).scalars()]
+
+
+def cpu_per_call(fn, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        result = fn()
+    return (time.process_time() - start) / repeat * 1000, result
+
+
+def run(provider, label, data, repeat):
+    print(f'{label}')
+    print(f'  {"backend":<8} {"format":<8} {"coding":<8} {"bytes":>10} {"encode ms":>10} {"total ms":>10}')
+    encoders = [(name, 'json', lambda b=backend: b(provider, data)) for name, backend in JSON_BACKENDS.items()]
+    if msgpack is not None:
+        encoders.append(('-', 'msgpack', lambda: msgpack.packb(data, use_bin_type=True)))
+    codings = ['identity', 'gzip', 'deflate'] + (['br'] if brotli is not None else [])
+    for backend, fmt, encode in encoders:
+        encode_ms, body = cpu_per_call(encode, repeat)
+        for coding in codings:
+            if coding == 'identity':
+                size, compress_ms = len(body), 0.0
+            else:
+                compress_ms, wire = cpu_per_call(lambda c=coding: compress(body, c), repeat)
+                size = len(wire)
+            print(f'  {backend:<8} {fmt:<8} {coding:<8} {size:>10} {encode_ms:>10.2f} {encode_ms + compress_ms:>10.2f}')
+
+
+def main(limit):
+    app = build_app()
+    with app.app_context():
+        db.create_all()
+        seed()
+        provider = EncodingJSONProvider(app)
+        repeat = max(5, 20000 // limit)
+        run(provider, f'GET /reservations (detail), {limit} rows', payload(Reservation, limit), repeat)
+        run(provider, f'GET /rooms?include=reservations.guests, {min(limit, ROOMS)} rooms',
+            payload(Rooms, limit), max(3, repeat // 20))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
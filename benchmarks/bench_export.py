@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Stream /export/reservations in each format and report throughput and peak memory.
+
+Seeds a throwaway SQLite file with the given number of reservations, then
+runs every export in a fresh process, so each peak RSS is that export's own.
+Peak RSS should stay flat as the row count grows.
+
+Run from the repository root:  python benchmarks/bench_export.py [reservations]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DB_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models import db, Guest, Rooms, Reservation
+
+app = create_app()
+ROOMS = 100
+GUESTS = 1000
+CHUNK = 20000
+EXPORTS = ['format=csv', 'format=csv&gzip=1', 'format=msgpack', 'format=msgpack&gzip=1']
+
+
+def setup(count):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(db.insert(Rooms), [
+            dict(id=i, room_number=100 + i, room_type='double', price_per_night=80, status='available', image='')
+            for i in range(1, ROOMS + 1)
+        ])
+        db.session.execute(db.insert(Guest), [
+            dict(id=i, name=f'Guest {i}', email=f'guest{i}@example.com', phone=f'{254700000000 + i}')
+            for i in range(1, GUESTS + 1)
+        ])
+        start = datetime(2020, 1, 1, 14)
+        for offset in range(0, count, CHUNK):
+            db.session.execute(db.insert(Reservation), [
+                dict(id=i, check_in_date=start + timedelta(days=i // ROOMS * 3),
+                     check_out_date=start + timedelta(days=i // ROOMS * 3 + 2, hours=-3), total_price=160,
+                     guest_id=i % GUESTS + 1, room_id=i % ROOMS + 1, created_at=start)
+                for i in range(offset + 1, min(count, offset + CHUNK) + 1)
+            ])
+        db.session.commit()
+
+
+def peak_rss_mb():
+    # ru_maxrss carries the forking parent's peak over into the child on Linux; VmHWM starts afresh at exec
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def export(query):
+    with app.app_context():
+        token = create_access_token(identity='bench', additional_claims={'role': 'admin'})
+    client = app.test_client()
+    started = time.perf_counter()
+    response = client.get(f'/export/reservations?{query}', headers={'Authorization': f'Bearer {token}'},
+                          buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    elapsed = time.perf_counter() - started
+    rss = peak_rss_mb()
+    print(f'{query:<24} {elapsed:>8.2f} {size / 2 ** 20:>9.1f} {size / 2 ** 20 / elapsed:>8.1f} {rss:>12.1f}')
+
+
+def main(count):
+    setup(count)
+    print(f'{count} reservations')
+    print(f'{"export":<24} {"seconds":>8} {"MB":>9} {"MB/s":>8} {"peak RSS MB":>12}')
+    for query in EXPORTS:
+        subprocess.run([sys.executable, __file__, '--export', query], check=True, env=os.environ)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--export']:
+        export(sys.argv[2])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""p99 latency of GET /rooms while a burst of logins hashes passwords.
+
+Starts app.py on a threaded local server against a throwaway SQLite file and
+runs the same storm with hashing inline (0 workers) and on the bounded pool.
+
+Run from the repository root:  python benchmarks/bench_login_storm.py [logins]
+"""
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DB_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+from werkzeug.serving import make_server
+import hashing
+from app import create_app
+from models import db
+
+app = create_app()
+
+LOGIN_THREADS = 32
+
+
+def call(base, method, path, body=None, token=None):
+    request = urllib.request.Request(base + path, method=method, data=json.dumps(body).encode() if body else None)
+    request.add_header('Content-Type', 'application/json')
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def storm(base, token, logins, workers):
+    app.config['HASH_POOL_WORKERS'] = workers
+    hashing._pool = None
+    statuses = Counter()
+    latencies = []
+    done = threading.Event()
+    remaining = iter(range(logins))
+    lock = threading.Lock()
+
+    def login():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            status, _ = call(base, 'POST', '/login', {'username': 'bench', 'password': 'bench-password'})
+            statuses[status] += 1
+
+    def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            call(base, 'GET', '/rooms', token=token)
+            latencies.append(time.perf_counter() - start)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=login) for _ in range(LOGIN_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    prober.join()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    label = 'inline' if not workers else f'pool ({workers} workers)'
+    print(f'{label:<20} logins {dict(statuses)} in {elapsed:5.2f}s  '
+          f'GET /rooms p50 {statistics.median(latencies) * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms')
+
+
+def main(logins):
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    with app.app_context():
+        db.create_all()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    call(base, 'POST', '/register', {'username': 'bench', 'password': 'bench-password', 'role': 'admin'})
+    _, body = call(base, 'POST', '/login', {'username': 'bench', 'password': 'bench-password'})
+    token = json.loads(body)['access_token']
+    for workers in (0, max(1, (os.cpu_count() or 2) // 2)):
+        storm(base, token, logins, workers)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
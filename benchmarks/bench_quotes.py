@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Price a search page of candidate stays with POST /quotes, against a year of rate overrides.
+
+Reports requests/s, stays priced per second and the queries each request
+issued, cold (after a rooms write) and warm.
+
+Run from the repository root:  python benchmarks/bench_quotes.py [stays per request] [requests]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DB_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app
+from models import db, Rooms, RateOverride, ROOM_TYPES
+from response_cache import bump_version
+
+app = create_app()
+ROOMS = 200
+
+
+def setup():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(db.insert(Rooms), [
+            dict(id=i, room_number=100 + i, room_type=ROOM_TYPES[i % 3], price_per_night=50 + i % 7 * 10,
+                 status='available', image='')
+            for i in range(1, ROOMS + 1)
+        ])
+        today = date.today()
+        db.session.execute(db.insert(RateOverride), [
+            dict(day=today + timedelta(days=d), room_type=room_type, price_per_night=120)
+            for d in range(0, 365, 2) for room_type in ROOM_TYPES
+        ])
+        db.session.commit()
+        return create_access_token(identity='bench')
+
+
+def stays(rng, count):
+    items = []
+    for _ in range(count):
+        check_in = date.today() + timedelta(days=rng.randint(1, 300))
+        stay = {'check_in': str(check_in), 'check_out': str(check_in + timedelta(days=rng.randint(1, 14)))}
+        if rng.random() < 0.5:
+            stay['room_id'] = rng.randint(1, ROOMS)
+        else:
+            stay['room_type'] = rng.choice(ROOM_TYPES)
+        items.append(stay)
+    return items
+
+
+def main(per_request, requests):
+    token = setup()
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    rng = random.Random(1)
+    queries = [0]
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', lambda *args: queries.__setitem__(0, queries[0] + 1))
+
+    for label, invalidate in (('cold', True), ('warm', False)):
+        elapsed = 0.0
+        queries[0] = 0
+        for _ in range(requests):
+            if invalidate:
+                with app.app_context():
+                    bump_version('rooms')
+                    db.session.commit()
+                queries[0] -= 1
+            body = stays(rng, per_request)
+            started = time.perf_counter()
+            response = client.post('/quotes', json=body, headers=headers)
+            elapsed += time.perf_counter() - started
+            assert response.status_code == 200 and not response.get_json()['errors']
+        print(f'{label}: {requests / elapsed:.0f} requests/s, {per_request * requests / elapsed:.0f} stays/s, '
+              f'{queries[0] / requests:.1f} queries/request ({per_request} stays each)')
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [500, 50][len(args):]))
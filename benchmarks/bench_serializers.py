@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Compare SerializerMixin.to_dict() with the compiled serializers on 10k rows.
+
+Run from the repository root:  python benchmarks/bench_serializers.py [rows]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models import db, Guest, Rooms, Reservation
+from serializers import get_plan, dumps
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(rows):
+    now = datetime.now()
+    db.session.execute(db.insert(Rooms), [
+        dict(id=i, room_number=i, room_type='single', price_per_night=50,
+             status='available', image='https://images.example.com/room.jpg', created_at=now)
+        for i in range(1, 101)
+    ])
+    db.session.execute(db.insert(Guest), [
+        dict(id=i, name=f'Guest {i}', email=f'guest{i}@example.com', phone=f'{i:012d}', created_at=now)
+        for i in range(1, rows + 1)
+    ])
+    db.session.execute(db.insert(Reservation), [
+        dict(id=i, check_in_date=now + timedelta(days=i % 30), check_out_date=now + timedelta(days=i % 30 + 3),
+             total_price=150, guest_id=i, room_id=i % 100 + 1, created_at=now)
+        for i in range(1, rows + 1)
+    ])
+    db.session.commit()
+
+
+def timed(label, fn, rows):
+    start = time.perf_counter()
+    fn(rows)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<40} {elapsed * 1000:9.1f} ms  {len(rows) / elapsed:12.0f} rows/s')
+
+
+def main(count):
+    app = build_app()
+    with app.app_context():
+        db.create_all()
+        seed(count)
+        for model in (Guest, Reservation):
+            rows = db.session.execute(db.select(model)).scalars().all()
+            # Warm-up pass triggers the lazy loads so only serialization is timed
+            for row in rows:
+                row.to_dict()
+            print(f'{model.__name__} x {len(rows)}')
+            timed('  SerializerMixin.to_dict()', lambda rs: [r.to_dict() for r in rs], rows)
+            timed('  compiled detail view', lambda rs: [get_plan(model)(r) for r in rs], rows)
+            timed('  compiled summary view', lambda rs: [get_plan(model, 'summary')(r) for r in rs], rows)
+            timed('  compiled detail view -> JSON bytes', lambda rs: dumps(rs, get_plan(model)), rows)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Cold start of the app: time to import it and build it, peak RSS and modules loaded.
+
+Each sample runs in a fresh interpreter, once as a server worker would
+build the app and once inside a click context as the `flask` CLI does,
+which also loads the migration and worker commands.
+
+Run from the repository root:  python benchmarks/bench_startup.py [samples]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, resource, sys, time
+started = time.perf_counter()
+import click
+from app import create_app
+if sys.argv[1] == 'cli':
+    with click.Context(click.Command('probe')):
+        app = create_app()
+else:
+    app = create_app()
+elapsed = time.perf_counter() - started
+print(json.dumps({'ms': elapsed * 1000, 'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'modules': len(sys.modules), 'commands': sorted(app.cli.commands)}))
+'''
+
+
+def sample(mode, env):
+    output = subprocess.run([sys.executable, '-c', PROBE, mode], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main(samples):
+    env = dict(os.environ, DB_URI=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}")
+    print(f'{"context":<8} {"median ms":>10} {"min ms":>8} {"max RSS MB":>11} {"modules":>8}  commands')
+    for mode in ('server', 'cli'):
+        runs = [sample(mode, env) for _ in range(samples)]
+        times = [run['ms'] for run in runs]
+        print(f'{mode:<8} {statistics.median(times):>10.0f} {min(times):>8.0f} '
+              f'{max(run["rss"] for run in runs):>11.1f} {runs[-1]["modules"]:>8}  '
+              f'{", ".join(runs[-1]["commands"]) or "-"}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""Reproducible HTTP load test for the API.
+
+Builds a fresh database (SQLite file by default, or --db-uri for a local
+Postgres), migrates and seeds it with seed.py, starts the app (gunicorn if
+installed, otherwise Werkzeug's threaded server), then drives a weighted mix
+of requests from concurrent clients for a fixed duration.
+
+Per-route throughput and p50/p95/p99 latency are written to a JSON results
+file and, if a baseline file exists, compared against it.
+
+Run from the repository root:
+    python benchmarks/loadtest.py --scale small --duration 30 --concurrency 16
+    python benchmarks/loadtest.py --update-baseline       # record benchmarks/baseline.json
+    python benchmarks/loadtest.py --max-regression 10     # exit 1 if any route got >10% slower
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+SCALES = {
+    'tiny': {'rooms': 20, 'guests': 200, 'reservations': 1000},
+    'small': {'rooms': 50, 'guests': 1000, 'reservations': 5000},
+    'medium': {'rooms': 200, 'guests': 100000, 'reservations': 1000000},
+}
+USERNAME = 'loadtest'
+PASSWORD = 'loadtest-password'
+
+# (name, weight): the share of operations each client picks
+WORKLOAD = [
+    ('POST /login', 2),
+    ('GET /rooms', 25),
+    ('GET /rooms/<id>', 15),
+    ('GET /rooms/available', 10),
+    ('GET /guests/<id>', 20),
+    ('GET /guests', 5),
+    ('GET /reservations', 3),
+    ('POST /reservations', 10),
+    ('DELETE /reservations/<id>', 10),
+    ('POST /quotes', 5),
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Client:
+    def __init__(self, port, token=None):
+        self.port = port
+        self.token = token
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        payload = json.dumps(body) if body is not None else None
+        for attempt in (0, 1):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+            try:
+                self.conn.request(method, path, payload, headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                if response.getheader('Connection', '').lower() == 'close' or response.version == 10:
+                    self.conn.close()
+                    self.conn = None
+                return response.status, data
+            except (http.client.HTTPException, OSError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+
+class Workload:
+    """One client's view of the mix: picks operations and builds their requests."""
+
+    def __init__(self, client, rng, sizes):
+        self.client = client
+        self.rng = rng
+        self.sizes = sizes
+        self.created = []
+        names, weights = zip(*WORKLOAD)
+        self.names = names
+        self.weights = weights
+
+    def next(self):
+        name = self.rng.choices(self.names, self.weights)[0]
+        if name == 'DELETE /reservations/<id>' and not self.created:
+            name = 'POST /reservations'
+        return name, getattr(self, 'op_' + name.split()[0].lower() + '_' + self._slug(name))
+
+    @staticmethod
+    def _slug(name):
+        return name.split()[1].strip('/').replace('/<id>', '_id').replace('/', '_')
+
+    def op_post_login(self):
+        return self.client.request('POST', '/login', {'username': USERNAME, 'password': PASSWORD})
+
+    def op_get_rooms(self):
+        return self.client.request('GET', '/rooms?view=summary')
+
+    def op_get_rooms_id(self):
+        return self.client.request('GET', f"/rooms/{self.rng.randint(1, self.sizes['rooms'])}")
+
+    def op_get_rooms_available(self):
+        check_in = datetime.now().date() + timedelta(days=self.rng.randint(1, 120))
+        check_out = check_in + timedelta(days=self.rng.randint(1, 7))
+        return self.client.request('GET', f'/rooms/available?check_in={check_in}&check_out={check_out}')
+
+    def op_get_guests_id(self):
+        return self.client.request('GET', f"/guests/{self.rng.randint(1, self.sizes['guests'])}")
+
+    def op_get_guests(self):
+        return self.client.request('GET', '/guests?limit=50')
+
+    def op_get_reservations(self):
+        return self.client.request('GET', '/reservations?limit=50')
+
+    def op_post_reservations(self):
+        # Far beyond the seeded stays so most bookings succeed; clashes get 409
+        check_in = datetime.now() + timedelta(days=self.rng.randint(1000, 20000))
+        status, body = self.client.request('POST', '/reservations', {
+            'check_in_date': check_in.strftime('%Y-%m-%d 14:00:00'),
+            'check_out_date': (check_in + timedelta(days=2)).strftime('%Y-%m-%d 11:00:00'),
+            'guest_id': self.rng.randint(1, self.sizes['guests']),
+            'room_id': self.rng.randint(1, self.sizes['rooms']),
+        })
+        if status == 201:
+            self.created.append(json.loads(body)['id'])
+        return status, body
+
+    def op_post_quotes(self):
+        # A search results page: every room type over a spread of candidate stays
+        stays = []
+        for _ in range(100):
+            check_in = datetime.now().date() + timedelta(days=self.rng.randint(1, 120))
+            stays.append({
+                'room_type': self.rng.choice(('single', 'double', 'suite')),
+                'check_in': str(check_in),
+                'check_out': str(check_in + timedelta(days=self.rng.randint(1, 7))),
+            })
+        return self.client.request('POST', '/quotes', stays)
+
+    def op_delete_reservations_id(self):
+        return self.client.request('DELETE', f'/reservations/{self.created.pop()}')
+
+
+def prepare_database(db_uri, sizes, seed, env):
+    env = dict(env, DB_URI=db_uri, FLASK_APP=os.path.join(ROOT, 'app.py'))
+    subprocess.run(['flask', 'db', 'upgrade', '-d', os.path.join(ROOT, 'migrations')],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+    subprocess.run([sys.executable, os.path.join(ROOT, 'seed.py'), '--rooms', str(sizes['rooms']),
+                    '--guests', str(sizes['guests']), '--reservations', str(sizes['reservations']),
+                    '--seed', str(seed)], cwd=ROOT, env=env, check=True, capture_output=True)
+
+
+def start_server(port, workers, env):
+    if shutil.which('gunicorn'):
+        command = ['gunicorn', '-w', str(workers), '--threads', '4', '-b', f'127.0.0.1:{port}',
+                   '--log-level', 'warning', 'app:create_app()']
+        server = 'gunicorn'
+    else:
+        command = [sys.executable, '-c',
+                   'import logging, sys; from werkzeug.serving import run_simple; from app import create_app; '
+                   'logging.getLogger("werkzeug").setLevel(logging.ERROR); '
+                   f'run_simple("127.0.0.1", {port}, create_app(), threaded=True)']
+        server = 'werkzeug'
+    process = subprocess.Popen(command, cwd=ROOT, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process, server
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('Server did not start')
+
+
+def run_load(port, token, sizes, duration, concurrency, seed, warmup):
+    samples = {name: [] for name, _ in WORKLOAD}
+    statuses = {name: {} for name, _ in WORKLOAD}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + warmup + duration
+    record_from = time.perf_counter() + warmup
+
+    def client_loop(n):
+        workload = Workload(Client(port, token), random.Random(seed * 1000 + n), sizes)
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            name, op = workload.next()
+            start = time.perf_counter()
+            try:
+                status, _ = op()
+            except (http.client.HTTPException, OSError):
+                status = 'error'
+            elapsed = time.perf_counter() - start
+            if start >= record_from:
+                with lock:
+                    samples[name].append(elapsed)
+                    statuses[name][str(status)] = statuses[name].get(str(status), 0) + 1
+
+    threads = [threading.Thread(target=client_loop, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    routes = {}
+    for name, values in samples.items():
+        values.sort()
+        routes[name] = {
+            'requests': len(values),
+            'throughput': round(len(values) / duration, 2),
+            'p50_ms': round(percentile(values, 50) * 1000, 3) if values else None,
+            'p95_ms': round(percentile(values, 95) * 1000, 3) if values else None,
+            'p99_ms': round(percentile(values, 99) * 1000, 3) if values else None,
+            'statuses': statuses[name],
+        }
+    total = sum(r['requests'] for r in routes.values())
+    return {'total_throughput': round(total / duration, 2), 'routes': routes}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_regression):
+    """Print per-route changes against the baseline; return the routes that regressed."""
+    regressed = []
+    print(f"\n{'route':<28} {'p95 ms':>10} {'base':>10} {'change':>8}   {'req/s':>8} {'base':>8}")
+    for name, route in results['routes'].items():
+        base = baseline['routes'].get(name)
+        if not base or not route['p95_ms'] or not base['p95_ms']:
+            continue
+        change = (route['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100
+        flag = ''
+        if max_regression is not None and change > max_regression:
+            regressed.append(name)
+            flag = '  REGRESSED'
+        print(f"{name:<28} {route['p95_ms']:>10.2f} {base['p95_ms']:>10.2f} {change:>+7.1f}%"
+              f"   {route['throughput']:>8.1f} {base['throughput']:>8.1f}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--db-uri', help='Database to benchmark against; it is migrated and reseeded. '
+                                         'Defaults to a throwaway SQLite file')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before measuring')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=os.path.join(ROOT, 'bench_results.json'))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--max-regression', type=float, help='Fail if any route p95 grows by more than this percent')
+    args = parser.parse_args()
+
+    sizes = SCALES[args.scale]
+    db_uri = args.db_uri or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'loadtest.db')}"
+    env = dict(os.environ, DB_URI=db_uri, JWT_SECRET_KEY=os.environ.get('JWT_SECRET_KEY', 'loadtest-' + 'k' * 32),
+               METRICS_DIR=tempfile.mkdtemp())
+    print(f'Seeding {sizes} into {db_uri}')
+    prepare_database(db_uri, sizes, args.seed, env)
+
+    port = free_port()
+    process, server = start_server(port, args.workers, env)
+    try:
+        client = Client(port)
+        client.request('POST', '/register', {'username': USERNAME, 'password': PASSWORD, 'role': 'admin'})
+        status, body = client.request('POST', '/login', {'username': USERNAME, 'password': PASSWORD})
+        if status != 200:
+            raise RuntimeError(f'Login failed: {status} {body[:200]!r}')
+        token = json.loads(body)['access_token']
+        print(f'Running {args.concurrency} clients for {args.duration}s against {server}')
+        load = run_load(port, token, sizes, args.duration, args.concurrency, args.seed, args.warmup)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'config': {'database': db_uri.split(':')[0], 'scale': args.scale, 'sizes': sizes, 'server': server,
+                   'workers': args.workers, 'concurrency': args.concurrency, 'duration': args.duration,
+                   'seed': args.seed},
+        **load,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Total {results['total_throughput']} req/s, results written to {args.output}")
+    for name, route in results['routes'].items():
+        if route['requests']:
+            print(f"  {name:<28} {route['throughput']:>8.1f} req/s  p50 {route['p50_ms']:>8.2f}  "
+                  f"p95 {route['p95_ms']:>8.2f}  p99 {route['p99_ms']:>8.2f} ms  {route['statuses']}")
+
+    regressed = []
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('machine') != results['machine'] or baseline.get('config') != results['config']:
+            # Latencies only compare on the same machine and settings
+            print(f"Warning: baseline was recorded with {baseline.get('machine')} {baseline.get('config')}")
+        regressed = compare(results, baseline, args.max_regression)
+    elif args.max_regression is not None and not args.update_baseline:
+        print(f'No baseline at {args.baseline} to check --max-regression against; record one with --update-baseline')
+        sys.exit(2)
+    if args.update_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f'Baseline updated: {args.baseline}')
+    if regressed:
+        print(f"Regressed beyond {args.max_regression}%: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import random
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+from engines import SQLITE_BUSY_TIMEOUT_MS
+from models import db, Rooms, Reservation
+from availability import is_booked
+from changes import record_change
+from jobs import enqueue, reservation_payload
+from pricing import stay_price
+from reports import record_stays
+from response_cache import bump_version
+from serializers import get_plan
+
+# First key of pg_advisory_xact_lock(int, int), so room locks can't collide
+# with advisory locks taken for anything else
+ROOM_LOCK_NAMESPACE = 7301
+DEFAULT_RETRIES = 5
+DEFAULT_LOCK_TIMEOUT_MS = 1000
+BACKOFF_BASE = 0.01
+BACKOFF_MAX = 0.5
+DEFAULT_RETRY_AFTER = 1
+
+_write_gates = {}
+_write_gates_lock = threading.Lock()
+
+
+class BookingConflict(Exception):
+    pass
+
+
+class BookingBusy(Exception):
+    def __init__(self, retry_after):
+        super().__init__('Too many bookings at once, try again shortly')
+        self.retry_after = retry_after
+
+
+def _begin_immediate(timeout_ms):
+    # pysqlite only opens a transaction at the first INSERT, so the overlap
+    # check would otherwise read outside it. BEGIN IMMEDIATE takes the write
+    # lock up front; the wait for it is bounded by timeout_ms.
+    connection = db.session.connection()
+    if connection.connection.driver_connection.in_transaction:
+        return
+    connection.exec_driver_sql(f'PRAGMA busy_timeout = {timeout_ms}')
+    try:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+    finally:
+        connection.exec_driver_sql(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}')
+
+
+def lock_rooms(room_ids):
+    """Serialize bookings of these rooms until the transaction ends.
+
+    Postgres takes a transaction-scoped advisory lock per room, so bookings
+    of other rooms and plain room updates go ahead. SQLite has one writer
+    at a time anyway, so the transaction just takes the write lock first.
+    Other databases lock the rooms rows. Locks are taken in id order so two
+    batches can't deadlock.
+    """
+    timeout_ms = current_app.config.get('BOOKING_LOCK_TIMEOUT_MS', DEFAULT_LOCK_TIMEOUT_MS)
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _begin_immediate(timeout_ms)
+    elif dialect == 'postgresql':
+        db.session.execute(db.text(f"SET LOCAL lock_timeout = '{int(timeout_ms)}ms'"))
+        for room_id in sorted(set(room_ids)):
+            db.session.execute(db.select(db.func.pg_advisory_xact_lock(ROOM_LOCK_NAMESPACE, room_id)))
+    else:
+        db.session.execute(
+            db.select(Rooms.id).where(Rooms.id.in_(set(room_ids))).order_by(Rooms.id).with_for_update()
+        )
+
+
+def is_lock_timeout(error):
+    # SQLite's busy timeout ran out, or Postgres' lock_not_available
+    return 'database is locked' in str(error.orig) or getattr(error.orig, 'pgcode', None) == '55P03'
+
+
+def _write_gate(engine):
+    # SQLite lets one connection write at a time whatever the rooms. Queueing
+    # this process's bookings on a lock hands the write lock straight to the
+    # next one, instead of leaving them all polling in SQLite's busy handler.
+    if engine.dialect.name != 'sqlite':
+        return None
+    with _write_gates_lock:
+        return _write_gates.setdefault(engine, threading.Lock())
+
+
+def _attempt(fn, gate, timeout_ms):
+    if gate is None:
+        return True, fn()
+    if not gate.acquire(timeout=timeout_ms / 1000):
+        return False, None
+    try:
+        return True, fn()
+    finally:
+        gate.release()
+
+
+def with_lock_retries(fn):
+    """Run a locking transaction, retrying with jittered backoff when its lock wait times out.
+
+    `fn` must commit or roll back before it returns.
+    """
+    retries = current_app.config.get('BOOKING_RETRIES', DEFAULT_RETRIES)
+    timeout_ms = current_app.config.get('BOOKING_LOCK_TIMEOUT_MS', DEFAULT_LOCK_TIMEOUT_MS)
+    gate = _write_gate(db.session.get_bind())
+    for attempt in range(retries + 1):
+        try:
+            done, result = _attempt(fn, gate, timeout_ms)
+            if done:
+                return result
+        except OperationalError as e:
+            db.session.rollback()
+            if not is_lock_timeout(e):
+                raise
+        if attempt < retries:
+            time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+    raise BookingBusy(DEFAULT_RETRY_AFTER)
+
+
+def _book(data):
+    reservation = Reservation(
+        check_in_date=data['check_in_date'],
+        check_out_date=data['check_out_date'],
+        guest_id=data['guest_id'],
+        room_id=data['room_id'],
+    )
+    if reservation.check_out_date <= reservation.check_in_date:
+        raise ValueError('check_out_date must be after check_in_date')
+    try:
+        lock_rooms([reservation.room_id])
+        room = db.session.get(Rooms, reservation.room_id)
+        if not room:
+            raise ValueError('Room not found')
+        if is_booked(reservation.room_id, reservation.check_in_date, reservation.check_out_date):
+            raise BookingConflict('Room is already booked for those dates')
+        price = stay_price(room.id, reservation.check_in_date, reservation.check_out_date)
+        if data.get('total_price') is not None and data['total_price'] != price:
+            raise ValueError(f'total_price does not match the quoted price of {price}')
+        reservation.total_price = price
+        db.session.add(reservation)
+        db.session.flush()
+        record_change('reservations', 'created', get_plan(Reservation, 'summary')(reservation))
+        record_stays([(room.room_type, reservation.check_in_date, reservation.check_out_date, reservation.total_price)])
+        bump_version('reservations')
+        enqueue('reservation_notification', reservation_payload('created', reservation, room.room_number))
+        db.session.commit()
+    except Exception:
+        # Releases the lock straight away
+        db.session.rollback()
+        raise
+    return reservation
+
+
+def book(data):
+    """Insert and commit a reservation unless its room is already taken for those dates.
+
+    The total comes from the rate table; a client-supplied total_price must
+    match it. Raises ValueError for bad input, BookingConflict when the stay
+    overlaps another one, and BookingBusy when the room's lock couldn't be had.
+    """
+    return with_lock_retries(lambda: _book(data))
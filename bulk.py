@@ -0,0 +1,253 @@
+import json
+from itertools import islice
+
+from flask import current_app, jsonify, request
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from models import db, Rooms, Reservation
+from booking import lock_rooms, with_lock_retries
+from changes import TOPICS, record_change
+from pricing import night_span, rate_table
+from reports import record_stays
+from response_cache import bump_version
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+
+
+class InvalidLine:
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class BulkRow:
+    __slots__ = ('index', 'values')
+
+    def __init__(self, index, values):
+        self.index = index
+        self.values = values
+
+
+class ModelImporter:
+    """Validates raw dicts with a model's own @validates hooks and inserts them in chunks.
+
+    Validation runs the same functions the ORM would call on attribute set,
+    but against plain dicts, so no instances are built and the insert is a
+    single executemany per chunk.
+    """
+
+    def __init__(self, model):
+        mapper = inspect(model)
+        self.model = model
+        self.columns = [c.key for c in mapper.column_attrs if not c.columns[0].primary_key]
+        self.required = [
+            c.key for c in mapper.column_attrs
+            if not c.columns[0].primary_key and not c.columns[0].nullable and c.columns[0].default is None
+        ]
+        self.validators = {key: fn for key, (fn, _) in mapper.validators.items()}
+
+    def validate(self, index, data):
+        if isinstance(data, InvalidLine):
+            raise ValueError(f'Invalid JSON: {data.error}')
+        if not isinstance(data, dict):
+            raise ValueError('Row must be a JSON object')
+        missing = [key for key in self.required if data.get(key) is None]
+        if missing:
+            raise ValueError(f"Missing data: {', '.join(missing)}")
+        values = {key: data[key] for key in self.columns if key in data}
+        for key, validator in self.validators.items():
+            if key in values:
+                values[key] = validator(None, key, values[key])
+        return BulkRow(index, values)
+
+    def check_chunk(self, rows):
+        """Hook for cross-row checks; returns the rows that may be inserted and the errors."""
+        return rows, []
+
+    def after_insert(self, rows):
+        """Hook for bookkeeping on the rows that made it in, in the same transaction."""
+
+    def insert(self, rows):
+        # Fast path: one executemany for the whole chunk. If a constraint
+        # fails, replay the chunk row by row so only the offending rows fail.
+        errors = []
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(self.model), [row.values for row in rows])
+            return rows, errors
+        except IntegrityError:
+            pass
+        inserted = []
+        for row in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(db.insert(self.model), [row.values])
+                inserted.append(row)
+            except IntegrityError as e:
+                errors.append({'index': row.index, 'error': str(e.orig)})
+        return inserted, errors
+
+    def write_chunk(self, rows):
+        """Check, insert and commit one chunk of validated rows; returns the inserted rows and the errors."""
+        rows, errors = self.check_chunk(rows)
+        done = []
+        if rows:
+            done, insert_errors = self.insert(rows)
+            self.after_insert(done)
+            errors.extend(insert_errors)
+            if done:
+                bump_version(self.model.__tablename__)
+                if self.model.__tablename__ in TOPICS:
+                    # Too many rows to send one by one; listeners reload instead
+                    record_change(self.model.__tablename__, 'imported', {'count': len(done)})
+        db.session.commit()
+        return done, errors
+
+    def run(self, items, chunk_size):
+        inserted = 0
+        errors = []
+        items = iter(enumerate(items))
+        while True:
+            chunk = list(islice(items, chunk_size))
+            if not chunk:
+                break
+            rows = []
+            for index, data in chunk:
+                try:
+                    rows.append(self.validate(index, data))
+                except (ValueError, TypeError, AttributeError) as e:
+                    errors.append({'index': index, 'error': str(e)})
+            done, chunk_errors = self.write_chunk(rows)
+            inserted += len(done)
+            errors.extend(chunk_errors)
+        errors.sort(key=lambda error: error['index'])
+        return inserted, errors
+
+
+class ReservationImporter(ModelImporter):
+    """Reservations are priced from the rate table like single bookings.
+
+    total_price may be left out; a row whose total doesn't match the quote fails.
+    """
+    room_types = None
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.required.remove('total_price')
+
+    def validate(self, index, data):
+        row = super().validate(index, data)
+        # Checked here so the chunk checks and room locks only ever see plain ids
+        for key in ('room_id', 'guest_id'):
+            if not isinstance(row.values[key], int) or isinstance(row.values[key], bool):
+                raise ValueError(f'{key} must be an integer')
+        return row
+
+    def write_chunk(self, rows):
+        # Same locking as single bookings, so a chunk can't race them
+        if not rows:
+            return super().write_chunk(rows)
+
+        def attempt():
+            lock_rooms([row.values['room_id'] for row in rows])
+            return super(ReservationImporter, self).write_chunk(rows)
+        return with_lock_retries(attempt)
+
+    def after_insert(self, rows):
+        record_stays([
+            (self.room_types[row.values['room_id']], row.values['check_in_date'],
+             row.values['check_out_date'], row.values['total_price'])
+            for row in rows
+        ])
+
+    def check_chunk(self, rows):
+        # One range query per chunk instead of an overlap query per row; rows
+        # accepted earlier in the chunk count as bookings too.
+        accepted, errors = [], []
+        valid = []
+        self.room_types = dict(db.session.execute(
+            db.select(Rooms.id, Rooms.room_type).where(Rooms.id.in_({row.values['room_id'] for row in rows}))
+        ).all())
+        # One rate table for the whole chunk, instead of a versions query per row
+        rates = rate_table()
+        for row in rows:
+            if row.values['room_id'] not in self.room_types:
+                errors.append({'index': row.index, 'error': 'Room not found'})
+                continue
+            if row.values['check_out_date'] <= row.values['check_in_date']:
+                errors.append({'index': row.index, 'error': 'check_out_date must be after check_in_date'})
+                continue
+            nights = night_span(row.values['check_in_date'], row.values['check_out_date'])
+            price = rates.price(row.values['room_id'], *nights)
+            if row.values.get('total_price') is not None and row.values['total_price'] != price:
+                errors.append({'index': row.index, 'error': f'total_price does not match the quoted price of {price}'})
+                continue
+            row.values['total_price'] = price
+            valid.append(row)
+        if not valid:
+            return accepted, errors
+        booked = {}
+        existing = db.session.execute(
+            db.select(Reservation.room_id, Reservation.check_in_date, Reservation.check_out_date).where(
+                Reservation.room_id.in_({row.values['room_id'] for row in valid}),
+                Reservation.check_in_date < max(row.values['check_out_date'] for row in valid),
+                Reservation.check_out_date > min(row.values['check_in_date'] for row in valid),
+            )
+        )
+        for room_id, check_in, check_out in existing:
+            booked.setdefault(room_id, []).append((check_in, check_out))
+        for row in valid:
+            stays = booked.setdefault(row.values['room_id'], [])
+            check_in, check_out = row.values['check_in_date'], row.values['check_out_date']
+            if any(start < check_out and end > check_in for start, end in stays):
+                errors.append({'index': row.index, 'error': 'Room is already booked for those dates'})
+                continue
+            stays.append((check_in, check_out))
+            accepted.append(row)
+        return accepted, errors
+
+
+def request_rows():
+    """Rows from the request body: a JSON array, or NDJSON read line by line."""
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+        return _ndjson_rows(request.stream)
+    data = request.get_json()
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array of objects')
+    return data
+
+
+def _ndjson_rows(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            # Keep the row's position so the error still lines up with its index
+            yield InvalidLine(str(e))
+
+
+def chunk_size():
+    default = current_app.config.get('BULK_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    try:
+        size = int(request.args.get('chunk_size', default))
+    except ValueError:
+        raise ValueError('chunk_size must be an integer')
+    if size < 1:
+        raise ValueError('chunk_size must be positive')
+    return min(size, MAX_CHUNK_SIZE)
+
+
+def bulk_import(importer):
+    """Shared body of the /bulk endpoints."""
+    try:
+        size = chunk_size()
+        inserted, errors = importer.run(request_rows(), size)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    status = 201 if inserted or not errors else 400
+    return jsonify({'inserted': inserted, 'errors': errors}), status
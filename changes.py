@@ -0,0 +1,217 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from flask import current_app, request
+from models import db, ChangeEvent
+
+TOPICS = ('rooms', 'reservations')
+POLL_INTERVAL = 0.5
+POLL_LIMIT = 500
+HEARTBEAT_INTERVAL = 15
+# Events a slow client may fall behind by before it is cut off to catch up from the log
+MAX_BACKLOG = 1000
+# Postgres hands out ids before commit, so a lower id can commit after a
+# higher one; the feed re-reads this many ids behind the newest it has seen
+REORDER_WINDOW = 100
+# Streams one process serves at once; each holds a worker thread while open
+DEFAULT_MAX_STREAMS = 16
+DEFAULT_RETRY_AFTER = 5
+
+_streams = 0
+_streams_lock = threading.Lock()
+
+
+class FeedBusy(Exception):
+    def __init__(self, retry_after):
+        super().__init__('Too many open event streams, try again shortly')
+        self.retry_after = retry_after
+
+
+def claim_stream():
+    """Count an /events stream against EVENTS_MAX_STREAMS, or raise FeedBusy when they're all taken."""
+    global _streams
+    limit = current_app.config.get('EVENTS_MAX_STREAMS', DEFAULT_MAX_STREAMS)
+    with _streams_lock:
+        if _streams >= limit:
+            raise FeedBusy(DEFAULT_RETRY_AFTER)
+        _streams += 1
+
+
+def release_stream():
+    global _streams
+    with _streams_lock:
+        _streams -= 1
+
+
+def record_change(topic, action, data):
+    """Append an event to the change log; call inside the transaction that makes the change."""
+    db.session.add(ChangeEvent(topic=topic, action=action, data=data))
+
+
+def record_changes(topic, action, rows):
+    if rows:
+        db.session.execute(db.insert(ChangeEvent), [{'topic': topic, 'action': action, 'data': data} for data in rows])
+
+
+def events_since(last_id, topics, limit=POLL_LIMIT):
+    return db.session.execute(
+        db.select(ChangeEvent.id, ChangeEvent.topic, ChangeEvent.action, ChangeEvent.data)
+        .where(ChangeEvent.id > last_id, ChangeEvent.topic.in_(topics))
+        .order_by(ChangeEvent.id)
+        .limit(limit)
+    ).all()
+
+
+def latest_id():
+    return db.session.execute(db.select(db.func.max(ChangeEvent.id))).scalar() or 0
+
+
+class Subscriber:
+    __slots__ = ('queue', 'topics', 'closed')
+
+    def __init__(self, topics):
+        self.queue = queue.Queue(MAX_BACKLOG)
+        self.topics = topics
+        self.closed = False
+
+
+class ChangeFeed:
+    """One poller per process that reads new events and fans them out to every open stream.
+
+    The log is queried once per POLL_INTERVAL however many clients are
+    connected, and not at all while none are.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.subscribers = set()
+        self.thread = None
+        self.last_id = 0
+        self.floor = 0
+        self.seen = deque(maxlen=REORDER_WINDOW)
+
+    def subscribe(self, topics):
+        subscriber = Subscriber(topics)
+        with self.lock:
+            if self.pid != os.getpid():
+                # Forked from a preloaded parent: its poller thread didn't come along
+                self.reset()
+            self.subscribers.add(subscriber)
+            if self.thread is None:
+                # Read the starting point before the caller's catch-up query,
+                # so nothing committed in between can fall through the gap
+                self.last_id = self.floor = latest_id()
+                self.seen.clear()
+                self.thread = threading.Thread(
+                    target=self._poll, args=(current_app._get_current_object(),), name='change-feed', daemon=True,
+                )
+                self.thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def _publish(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            if event.topic not in subscriber.topics:
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except queue.Full:
+                subscriber.closed = True
+                self.unsubscribe(subscriber)
+
+    def _poll(self, app):
+        with app.app_context():
+            while True:
+                with self.lock:
+                    if not self.subscribers:
+                        self.thread = None
+                        return
+                    start = max(0, self.last_id - REORDER_WINDOW)
+                events = events_since(start, TOPICS)
+                # Don't hold a pooled connection while sleeping
+                db.session.remove()
+                for event in events:
+                    if event.id <= self.floor or event.id in self.seen:
+                        continue
+                    self.seen.append(event.id)
+                    self.last_id = max(self.last_id, event.id)
+                    self._publish(event)
+                if len(events) < POLL_LIMIT:
+                    time.sleep(POLL_INTERVAL)
+
+
+feed = ChangeFeed()
+
+
+def _format(event):
+    return f'id: {event.id}\nevent: {event.topic}\ndata: {json.dumps({"action": event.action, **event.data})}\n\n'
+
+
+def parse_stream_args():
+    """Topics and starting cursor of an /events request; the cursor is None for live-only."""
+    topics = tuple(t for t in request.args.get('topics', ','.join(TOPICS)).split(',') if t)
+    unknown = set(topics) - set(TOPICS)
+    if unknown or not topics:
+        raise ValueError(f"topics must be a comma-separated subset of {', '.join(TOPICS)}")
+    since = request.args.get('since', request.headers.get('Last-Event-ID'))
+    if since is None:
+        return topics, None
+    try:
+        since = int(since)
+    except ValueError:
+        raise ValueError('since must be an event id')
+    if since < 0:
+        raise ValueError('since must be an event id')
+    return topics, since
+
+
+def event_stream(topics, since=None):
+    """SSE lines: events after `since` from the log, then live ones from the shared feed."""
+    subscriber = feed.subscribe(topics)
+    # Ids already sent, so events both read by the catch-up and queued by
+    # the feed go out once; anything older than this can't be in the queue
+    sent = deque(maxlen=MAX_BACKLOG + REORDER_WINDOW)
+    sent_ids = set()
+
+    def send(event):
+        if len(sent) == sent.maxlen:
+            sent_ids.discard(sent[0])
+        sent.append(event.id)
+        sent_ids.add(event.id)
+        return _format(event)
+
+    try:
+        if since is not None:
+            last_id = since
+            while True:
+                events = events_since(last_id, topics)
+                for event in events:
+                    yield send(event)
+                    last_id = event.id
+                if len(events) < POLL_LIMIT:
+                    break
+        db.session.remove()
+        yield ': connected\n\n'
+        while not subscriber.closed:
+            try:
+                event = subscriber.queue.get(timeout=HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            if event.id not in sent_ids and (since is None or event.id > since):
+                yield send(event)
+    finally:
+        feed.unsubscribe(subscriber)
@@ -0,0 +1,52 @@
+import time
+from datetime import datetime
+
+import click
+from flask import current_app
+from archive import DEFAULT_BATCH_SIZE, archive, archive_cutoff
+from jobs import Worker
+from reports import rebuild
+from room_status import tick
+
+
+def register_commands(app):
+    """Add the app's own `flask` commands; only loaded when running under the flask CLI."""
+
+    @app.cli.command('rebuild-reports')
+    def rebuild_reports():
+        """Recompute the occupancy rollup from the reservations table."""
+        reservations, rows = rebuild()
+        print(f'Rebuilt occupancy rollup from {reservations} reservations into {rows} rows')
+
+    @app.cli.command('archive-reservations')
+    @click.option('--older-than-days', type=int, help='Archive stays that checked out this many days ago '
+                  '[default: ARCHIVE_AFTER_DAYS, or 365].')
+    @click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Stays moved per transaction.')
+    @click.option('--max-batches', type=int, help='Stop after this many batches; run again to continue.')
+    def archive_reservations(older_than_days, batch_size, max_batches):
+        """Move past stays from reservations into reservations_archive."""
+        cutoff = archive_cutoff(older_than_days)
+        total = 0
+        for total in archive(cutoff, batch_size, max_batches):
+            pass
+        print(f'Archived {total} reservations that checked out before {cutoff:%Y-%m-%d}')
+
+    @app.cli.command('worker')
+    @click.option('--concurrency', default=4, show_default=True, help='Job batches run at once.')
+    @click.option('--batch-size', default=50, show_default=True, help='Jobs of one kind handed to a handler at once.')
+    @click.option('--poll-interval', default=1.0, show_default=True, help='Seconds between polls when idle.')
+    @click.option('--once', is_flag=True, help='Exit once no jobs are due.')
+    def run_worker(concurrency, batch_size, poll_interval, once):
+        """Run queued background jobs (notifications) until interrupted."""
+        Worker(current_app._get_current_object(), concurrency, batch_size, poll_interval).run(once=once)
+
+    @app.cli.command('room-status')
+    @click.option('--interval', type=float, help='Keep running, ticking every this many seconds.')
+    def room_status(interval):
+        """Mark rooms occupied at check-in and dirty at check-out."""
+        while True:
+            changed = tick()
+            print(f'{datetime.now():%Y-%m-%d %H:%M:%S} {changed} rooms changed status')
+            if not interval:
+                return
+            time.sleep(interval)
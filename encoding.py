@@ -0,0 +1,182 @@
+import json
+import time
+import zlib
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+from metrics import add_serialization_time
+
+# Optional speedups; without them responses fall back to the stdlib / identity
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'application/msgpack', 'text/csv'}
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVEL = 6
+# Brotli's high qualities are too slow for per-request compression
+BROTLI_QUALITY = 4
+
+
+def _stdlib_dumps(provider, obj):
+    return json.dumps(
+        obj, default=provider.default, ensure_ascii=provider.ensure_ascii,
+        sort_keys=provider.sort_keys, separators=(',', ':'),
+    ).encode()
+
+
+def _orjson_dumps(provider, obj):
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if provider.sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    # Dates go through Flask's default so both backends render them the same
+    return orjson.dumps(obj, default=provider.default, option=option)
+
+
+# name -> function(provider, obj) returning compact JSON bytes
+JSON_BACKENDS = {'json': _stdlib_dumps}
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = _orjson_dumps
+
+
+def default_backend():
+    return 'orjson' if 'orjson' in JSON_BACKENDS else 'json'
+
+
+def response_mimetype():
+    """The body format the current request asked for through Accept."""
+    if msgpack is None or not current_app.config.get('MSGPACK_ENABLED', True):
+        return 'application/json'
+    best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES, default='application/json')
+    return 'application/msgpack' if best in MSGPACK_MIMETYPES else 'application/json'
+
+
+class EncodingJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider on a pluggable backend (JSON_BACKEND), with MessagePack on request.
+
+    Every jsonify() and dict returned from a view goes through `response`,
+    which answers `Accept: application/msgpack` with MessagePack. Encode
+    time counts towards the request's serialization time.
+    """
+
+    def encode(self, obj):
+        """JSON bytes for `obj`, without a trailing newline."""
+        backend = JSON_BACKENDS[self._app.config.get('JSON_BACKEND') or default_backend()]
+        start = time.perf_counter()
+        try:
+            return backend(self, obj)
+        finally:
+            add_serialization_time(time.perf_counter() - start)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        mimetype = response_mimetype()
+        if mimetype == 'application/msgpack':
+            start = time.perf_counter()
+            body = msgpack.packb(obj, default=self.default, use_bin_type=True)
+            add_serialization_time(time.perf_counter() - start)
+        elif self._app.debug:
+            # Indented, like Flask's own provider, but still in the format that was asked for
+            body = self.dumps(obj, indent=2).encode() + b'\n'
+        else:
+            body = self.encode(obj) + b'\n'
+        response = self._app.response_class(body, mimetype=mimetype)
+        if msgpack is not None:
+            response.vary.add('Accept')
+        return response
+
+
+def _compressor(coding, level):
+    """(feed, finish) functions of a fresh compressor for `coding`."""
+    if coding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    # gzip framing for gzip, zlib framing for HTTP's "deflate"
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31 if coding == 'gzip' else 15)
+    return compressor.compress, compressor.flush
+
+
+def compress(data, coding, level=DEFAULT_LEVEL):
+    feed, finish = _compressor(coding, level)
+    return feed(data) + finish()
+
+
+def compress_stream(chunks, coding, level=DEFAULT_LEVEL):
+    """Compress a streamed body chunk by chunk, closing the original iterable when done."""
+    feed, finish = _compressor(coding, level)
+    try:
+        for chunk in chunks:
+            data = feed(chunk.encode() if isinstance(chunk, str) else chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def accepted_coding():
+    codings = ('br', 'gzip', 'deflate') if brotli is not None else ('gzip', 'deflate')
+    return request.accept_encodings.best_match(codings)
+
+
+def init_encoding(app):
+    """Use EncodingJSONProvider for every response and compress bodies the client can decode.
+
+    Buffered bodies are compressed from COMPRESS_MIN_SIZE bytes up; streamed
+    ones always are, since their size isn't known up front.
+    """
+    app.json = EncodingJSONProvider(app)
+
+    @app.after_request
+    def _compress(response):
+        config = current_app.config
+        if (
+            not config.get('COMPRESS_ENABLED', True)
+            or request.method == 'HEAD'
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype in COMPRESSIBLE_MIMETYPES or response.mimetype.startswith('text/'))
+            # Compressors hold output back; an event stream must reach the client as written
+            or response.mimetype == 'text/event-stream'
+        ):
+            return response
+        response.vary.add('Accept-Encoding')
+        coding = accepted_coding()
+        if coding is None or response.status_code < 200 or response.status_code == 204:
+            return response
+        level = config.get('COMPRESS_LEVEL', DEFAULT_LEVEL)
+        if response.status_code != 304:
+            start = time.perf_counter()
+            if response.is_streamed:
+                response.response = compress_stream(response.response, coding, level)
+                response.headers.pop('Content-Length', None)
+            else:
+                data = response.get_data()
+                if len(data) < config.get('COMPRESS_MIN_SIZE', DEFAULT_MIN_SIZE):
+                    return response
+                response.set_data(compress(data, coding, level))
+            add_serialization_time(time.perf_counter() - start)
+            response.headers['Content-Encoding'] = coding
+        # The compressed bytes differ from the ones the strong ETag names;
+        # If-None-Match compares weakly, so revalidation keeps working
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
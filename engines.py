@@ -0,0 +1,121 @@
+import os
+import sqlite3
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+READ_METHODS = ('GET', 'HEAD')
+REPLICA_BIND = 'replica'
+
+SQLITE_BUSY_TIMEOUT_MS = 5000
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # Wait for a lock instead of failing with "database is locked" at once
+    cursor.execute(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}')
+    try:
+        # WAL lets readers run alongside the writer; the setting is stored in
+        # the database file, so read-only connections can't (and needn't) set it
+        cursor.execute('PRAGMA journal_mode = WAL')
+    except sqlite3.OperationalError:
+        pass
+    # Safe with WAL: a crash can lose the last commits but never corrupts
+    cursor.execute('PRAGMA synchronous = NORMAL')
+    cursor.execute('PRAGMA temp_store = MEMORY')
+    cursor.close()
+
+
+def is_file_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def engine_options(uri, pool_size=DEFAULT_POOL_SIZE, max_overflow=DEFAULT_MAX_OVERFLOW):
+    """Engine settings for the database behind `uri`."""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        if not is_file_sqlite(uri):
+            return {}
+        return {'pool_size': pool_size, 'max_overflow': max_overflow, 'pool_pre_ping': False}
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+
+
+def _read_only_sqlite(database):
+    # A separate pool on the same file whose connections refuse to write;
+    # with WAL they read a consistent snapshot without blocking the writer
+    def connect():
+        connection = sqlite3.connect(database, check_same_thread=False)
+        connection.execute('PRAGMA query_only = ON')
+        return connection
+    return connect
+
+
+def bind_config(primary_uri, replica_uri=None, pool_size=DEFAULT_POOL_SIZE, max_overflow=DEFAULT_MAX_OVERFLOW):
+    """SQLALCHEMY_ENGINE_OPTIONS and SQLALCHEMY_BINDS for a primary/replica pair.
+
+    Without an explicit replica, a SQLite file gets a read-only pool on the
+    same file and other databases send every query to the primary. Each pool
+    keeps `pool_size` connections, which should cover the threads of a worker.
+    """
+    options = engine_options(primary_uri, pool_size, max_overflow)
+    if replica_uri:
+        return options, {REPLICA_BIND: {'url': replica_uri, **engine_options(replica_uri, pool_size, max_overflow)}}
+    if is_file_sqlite(primary_uri):
+        database = make_url(primary_uri).database
+        return options, {REPLICA_BIND: {'url': primary_uri, **options, 'creator': _read_only_sqlite(database)}}
+    return options, {}
+
+
+class RoutingSession(Session):
+    """Sends reads made while serving GET/HEAD requests to the replica engine.
+
+    Anything that flushes, and every other request, uses the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_request_context()
+            and g.get('read_only')
+            and REPLICA_BIND in self._db.engines
+        ):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def tune_engine(engine):
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _sqlite_pragmas)
+
+
+def init_engines(app, db):
+    """Apply the SQLite pragmas to the app's engines and route GET/HEAD reads to the replica.
+
+    A worker forked from a preloaded parent starts with fresh pools, so it
+    never shares the parent's connections.
+    """
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        tune_engine(engine)
+
+    def _dispose_after_fork():
+        # close=False leaves the parent's sockets alone; the child just drops them
+        for engine in engines:
+            engine.dispose(close=False)
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+    @app.before_request
+    def _mark_read_only():
+        g.read_only = request.method in READ_METHODS
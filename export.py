@@ -0,0 +1,192 @@
+import csv
+import io
+import threading
+
+from flask import Response, current_app, stream_with_context
+from models import db, Guest, Reservation, ArchivedReservation
+from availability import parse_date
+from archive import archived_through
+from encoding import DEFAULT_LEVEL, compress_stream, msgpack
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_CHUNK_SIZE = 50000
+DEFAULT_MAX_EXPORTS = 2
+DEFAULT_RETRY_AFTER = 5
+
+RESERVATION_COLUMNS = ('id', 'check_in_date', 'check_out_date', 'total_price', 'guest_id', 'room_id', 'created_at')
+GUEST_COLUMNS = ('id', 'name', 'email', 'phone', 'created_at')
+
+_running = 0
+_running_lock = threading.Lock()
+
+
+class ExportBusy(Exception):
+    def __init__(self, retry_after):
+        super().__init__('Too many exports running, try again shortly')
+        self.retry_after = retry_after
+
+
+def export_formats():
+    return ('csv', 'msgpack') if msgpack is not None else ('csv',)
+
+
+def _truthy(value):
+    return (value or '').lower() in ('1', 'true', 'yes')
+
+
+def parse_export_args(args):
+    """Format, chunk size and gzip flag of an export request."""
+    fmt = args.get('format', 'csv')
+    if fmt not in export_formats():
+        raise ValueError(f"format must be one of {', '.join(export_formats())}")
+    try:
+        chunk_size = int(args.get('chunk_size', current_app.config.get('EXPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)))
+    except ValueError:
+        raise ValueError('chunk_size must be an integer')
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f'chunk_size must be between 1 and {MAX_CHUNK_SIZE}')
+    return fmt, chunk_size, _truthy(args.get('gzip'))
+
+
+def _date_range(args):
+    start = parse_date(args['start'], 'start') if args.get('start') else None
+    end = parse_date(args['end'], 'end') if args.get('end') else None
+    return start, end
+
+
+def _int_arg(args, name):
+    if not args.get(name):
+        return None
+    try:
+        return int(args[name])
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+
+
+def _reservations(model, start, end, room_id, guest_id):
+    query = db.select(
+        *(getattr(model, c) for c in RESERVATION_COLUMNS),
+        db.literal(model is ArchivedReservation).label('archived'),
+    )
+    if start is not None:
+        query = query.where(model.check_out_date > start)
+    if end is not None:
+        query = query.where(model.check_in_date < end)
+    if room_id is not None:
+        query = query.where(model.room_id == room_id)
+    if guest_id is not None:
+        query = query.where(model.guest_id == guest_id)
+    return query.order_by(model.id)
+
+
+def reservation_export(args):
+    """Columns and queries for /export/reservations: stays overlapping start-end, optionally of one room or guest.
+
+    The archive is read first when the range reaches back into it. Each part
+    is read in id order, with no sort across the two.
+    """
+    start, end = _date_range(args)
+    room_id, guest_id = _int_arg(args, 'room_id'), _int_arg(args, 'guest_id')
+    queries = [_reservations(Reservation, start, end, room_id, guest_id)]
+    boundary = archived_through()
+    if boundary is not None and (start is None or start < boundary):
+        queries.insert(0, _reservations(ArchivedReservation, start, end, room_id, guest_id))
+    return RESERVATION_COLUMNS + ('archived',), queries
+
+
+def guest_export(args):
+    """Columns and query for /export/guests: guests created between start and end."""
+    start, end = _date_range(args)
+    query = db.select(*(getattr(Guest, c) for c in GUEST_COLUMNS))
+    if start is not None:
+        query = query.where(Guest.created_at >= start)
+    if end is not None:
+        query = query.where(Guest.created_at < end)
+    return GUEST_COLUMNS, [query.order_by(Guest.id)]
+
+
+def _rows(query, rows):
+    # Only the DateTime columns need formatting; isoformat is several times faster than strftime
+    dates = [i for i, column in enumerate(query.selected_columns) if isinstance(column.type, db.DateTime)]
+    rows = [list(row) for row in rows]
+    for row in rows:
+        for i in dates:
+            if row[i] is not None:
+                row[i] = row[i].isoformat(' ', 'seconds')
+    return rows
+
+
+def _chunks(queries, chunk_size):
+    # Server-side cursors, chunk_size rows at a time, so memory stays flat however many rows there
+    # are. Plain Core rows: the session still picks the read replica, but no ORM loading runs per row.
+    for query in queries:
+        result = db.session.connection().execute(query.execution_options(yield_per=chunk_size))
+        try:
+            for rows in result.partitions():
+                yield _rows(query, rows)
+        finally:
+            result.close()
+
+
+def _csv(columns, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _msgpack(columns, chunks):
+    # A {"columns": [...]} header, then one array per column for every chunk
+    yield msgpack.packb({'columns': list(columns)})
+    for rows in chunks:
+        yield msgpack.packb([list(column) for column in zip(*rows)])
+
+
+def _claim_slot(limit):
+    global _running
+    with _running_lock:
+        if _running >= limit:
+            raise ExportBusy(DEFAULT_RETRY_AFTER)
+        _running += 1
+
+
+def _release_slot():
+    global _running
+    with _running_lock:
+        _running -= 1
+
+
+def export_response(name, columns, queries, fmt, chunk_size, gzip):
+    """Stream the rows of `queries` as CSV or column-chunked MessagePack, optionally as a .gz file.
+
+    Only EXPORT_MAX_CONCURRENT exports run at once per process, so a burst
+    of dumps can't take every pooled connection; the rest get ExportBusy.
+    """
+    # Checked and taken under one lock, and given back when the response is
+    # closed, which also happens to a response whose body is never read
+    _claim_slot(current_app.config.get('EXPORT_MAX_CONCURRENT', DEFAULT_MAX_EXPORTS))
+    try:
+        def generate():
+            encode = _csv if fmt == 'csv' else _msgpack
+            body = encode(columns, _chunks(queries, chunk_size))
+            if gzip:
+                body = compress_stream(body, 'gzip', current_app.config.get('COMPRESS_LEVEL', DEFAULT_LEVEL))
+            yield from body
+
+        mimetype = 'text/csv' if fmt == 'csv' else 'application/msgpack'
+        filename = f'{name}.{fmt}'
+        if gzip:
+            mimetype, filename = 'application/gzip', filename + '.gz'
+        response = Response(stream_with_context(generate()), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.call_on_close(_release_slot)
+    except BaseException:
+        _release_slot()
+        raise
+    return response
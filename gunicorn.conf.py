@@ -0,0 +1,29 @@
+# gunicorn 'app:create_app()' -c gunicorn.conf.py
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5555)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', (os.cpu_count() or 1) * 2 + 1))
+# Threaded workers: every /events stream holds a thread for as long as it is open,
+# which under the sync worker would be the whole process
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+# One pooled connection per thread, so busy threads don't queue for pool_timeout
+# on a pool smaller than themselves (the app is built after this file runs)
+os.environ.setdefault('DB_POOL_SIZE', str(threads))
+# Build the app once in the master so workers share its memory copy-on-write;
+# each worker drops the inherited database pools right after the fork
+preload_app = True
+
+
+def when_ready(server):
+    # Keep the collector from touching (and so copying) the preloaded objects in every worker
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    # A dead worker's metrics file would otherwise be counted until its pid is reused
+    directory = os.environ.get('METRICS_DIR')
+    if directory:
+        from metrics import remove_worker_file
+        remove_worker_file(directory, worker.pid)
@@ -0,0 +1,87 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_TIMEOUT = 10
+DEFAULT_RETRY_AFTER = 1
+
+
+class HashPoolFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__('Too many login requests, try again shortly')
+        self.retry_after = retry_after
+
+
+class HashPool:
+    """A small executor that runs password hashing off the request thread.
+
+    At most `workers` hashes run at once and at most `queue_size` more may
+    wait; anything beyond that is rejected straight away instead of piling
+    up behind the key-derivation work.
+
+    The request thread still waits for its hash, so this only frees anything
+    with threaded or gevent workers, where the other requests of the process
+    keep running meanwhile. Under sync workers it just caps hashing per process.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hash')
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, fn, *args, timeout=DEFAULT_TIMEOUT, retry_after=DEFAULT_RETRY_AFTER):
+        if not self.slots.acquire(blocking=False):
+            raise HashPoolFull(retry_after)
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            raise HashPoolFull(retry_after)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    # Threads don't survive fork, so each gunicorn worker builds its own pool
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                config = current_app.config
+                workers = config.get('HASH_POOL_WORKERS', max(1, (os.cpu_count() or 2) // 2))
+                _pool = HashPool(workers, config.get('HASH_POOL_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)) if workers else None
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def _run(fn, *args):
+    pool = get_pool()
+    if pool is None:
+        return fn(*args)
+    config = current_app.config
+    return pool.run(
+        fn, *args,
+        timeout=config.get('HASH_POOL_TIMEOUT', DEFAULT_TIMEOUT),
+        retry_after=config.get('HASH_POOL_RETRY_AFTER', DEFAULT_RETRY_AFTER),
+    )
+
+
+def hash_password(password):
+    method = current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+    return _run(generate_password_hash, password, method)
+
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
@@ -0,0 +1,217 @@
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from flask import current_app
+from models import db, Guest, Job
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+FAILED = 'failed'
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_CONCURRENCY = 4
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_POLL_INTERVAL = 1.0
+# A running job whose worker hasn't finished it by then is handed out again
+DEFAULT_LEASE = 300
+RETRY_BASE = 5
+RETRY_MAX = 3600
+
+# kind -> function taking a list of payloads
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register a function that runs a batch of `kind` jobs.
+
+    It gets every payload in the batch at once, and the whole batch is
+    retried if it raises, so handlers must be safe to run twice.
+    """
+    def decorator(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+def enqueue(kind, payload, delay=0):
+    """Queue a job in the current transaction; it only becomes visible to workers once that commits."""
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind {kind!r}')
+    db.session.add(Job(kind=kind, payload=payload, status=PENDING, attempts=0,
+                       run_at=datetime.now() + timedelta(seconds=delay)))
+
+
+def claim(limit, lease=DEFAULT_LEASE):
+    """Mark up to `limit` due jobs as running and return them, oldest first.
+
+    The subquery and the UPDATE are one statement, so concurrent workers
+    never get the same job; Postgres skips rows another worker is claiming.
+    """
+    now = datetime.now()
+    due = (
+        db.select(Job.id)
+        .where(db.or_(
+            db.and_(Job.status == PENDING, Job.run_at <= now),
+            db.and_(Job.status == RUNNING, Job.locked_at < now - timedelta(seconds=lease)),
+        ))
+        .order_by(Job.id)
+        .limit(limit)
+    )
+    if db.session.get_bind().dialect.name == 'postgresql':
+        due = due.with_for_update(skip_locked=True)
+    rows = db.session.execute(
+        db.update(Job)
+        .where(Job.id.in_(due.scalar_subquery()))
+        .values(status=RUNNING, locked_at=now, attempts=Job.attempts + 1)
+        .returning(Job.id, Job.kind, Job.payload, Job.attempts)
+    ).all()
+    db.session.commit()
+    return sorted(rows, key=lambda row: row[0])
+
+
+def _finish(ids):
+    db.session.execute(db.delete(Job).where(Job.id.in_(ids)))
+    db.session.commit()
+
+
+def _fail(jobs, error, max_attempts):
+    now = datetime.now()
+    for job_id, _, _, attempts in jobs:
+        values = {'last_error': error[:2000], 'locked_at': None}
+        if attempts >= max_attempts:
+            values['status'] = FAILED
+        else:
+            # Exponential backoff with jitter so a failing batch doesn't retry in lockstep
+            delay = min(RETRY_MAX, RETRY_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+            values.update(status=PENDING, run_at=now + timedelta(seconds=delay))
+        db.session.execute(db.update(Job).where(Job.id == job_id).values(**values))
+    db.session.commit()
+
+
+def run_batch(kind, jobs, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Run one batch of same-kind jobs; delete them on success, reschedule or fail them otherwise."""
+    fn = HANDLERS.get(kind)
+    try:
+        if fn is None:
+            raise LookupError(f'No handler for job kind {kind!r}')
+        fn([payload for _, _, payload, _ in jobs])
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('%s batch of %d failed', kind, len(jobs))
+        _fail(jobs, f'{type(e).__name__}: {e}', max_attempts)
+        return False
+    _finish([job_id for job_id, _, _, _ in jobs])
+    return True
+
+
+def batches(jobs, batch_size):
+    by_kind = {}
+    for job in jobs:
+        by_kind.setdefault(job[1], []).append(job)
+    for kind, items in by_kind.items():
+        for i in range(0, len(items), batch_size):
+            yield kind, items[i:i + batch_size]
+
+
+class Worker:
+    """Claims due jobs and runs them on a bounded thread pool.
+
+    At most `concurrency` batches run at once; the worker only claims more
+    jobs when a slot is free, so nothing sits claimed behind a busy pool.
+    """
+
+    def __init__(self, app, concurrency=DEFAULT_CONCURRENCY, batch_size=DEFAULT_BATCH_SIZE,
+                 poll_interval=DEFAULT_POLL_INTERVAL):
+        self.app = app
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = app.config.get('JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+        self.lease = app.config.get('JOB_LEASE', DEFAULT_LEASE)
+
+    def _run(self, kind, jobs):
+        with self.app.app_context():
+            return run_batch(kind, jobs, self.max_attempts)
+
+    def run(self, once=False):
+        """Process jobs until interrupted, or with `once` until none are due."""
+        running = set()
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix='job') as pool:
+            try:
+                while True:
+                    free = self.concurrency - len(running)
+                    claimed = []
+                    if free:
+                        with self.app.app_context():
+                            claimed = claim(free * self.batch_size, self.lease)
+                    for kind, jobs in batches(claimed, self.batch_size):
+                        running.add(pool.submit(self._run, kind, jobs))
+                    if once and not claimed and not running:
+                        return
+                    if running and (not free or not claimed):
+                        done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    elif not claimed:
+                        time.sleep(self.poll_interval)
+            except KeyboardInterrupt:
+                # Finish what's running; anything left claimed is retried after its lease
+                logger.info('Stopping; waiting for %d running batches', len(running))
+
+
+def _guest_emails(guest_ids):
+    return dict(db.session.execute(
+        db.select(Guest.id, Guest.email).where(Guest.id.in_(set(guest_ids)))
+    ).all())
+
+
+@handler('reservation_notification')
+def send_reservation_notifications(payloads):
+    """Email guests about new and cancelled bookings, over one SMTP connection per batch.
+
+    Without MAIL_SERVER configured the messages are only logged.
+    """
+    from email.message import EmailMessage
+    import smtplib
+    emails = _guest_emails(p['guest_id'] for p in payloads)
+    messages = []
+    for payload in payloads:
+        address = emails.get(payload['guest_id'])
+        if address is None:
+            continue
+        message = EmailMessage()
+        message['From'] = current_app.config.get('MAIL_SENDER', 'reservations@localhost')
+        message['To'] = address
+        if payload['event'] == 'created':
+            message['Subject'] = 'Your booking is confirmed'
+            message.set_content(f"Room {payload['room_number']} is booked for you from "
+                                f"{payload['check_in_date']} to {payload['check_out_date']}.")
+        else:
+            message['Subject'] = 'Your booking was cancelled'
+            message.set_content(f"Your booking of room {payload['room_number']} from "
+                                f"{payload['check_in_date']} to {payload['check_out_date']} was cancelled.")
+        messages.append(message)
+
+    server = current_app.config.get('MAIL_SERVER')
+    if not server:
+        for message in messages:
+            logger.info('Would email %s: %s', message['To'], message['Subject'])
+        return
+    with smtplib.SMTP(server, current_app.config.get('MAIL_PORT', 25), timeout=30) as smtp:
+        for message in messages:
+            smtp.send_message(message)
+
+
+def reservation_payload(event, reservation, room_number):
+    return {
+        'event': event,
+        'guest_id': reservation.guest_id,
+        'room_number': room_number,
+        'check_in_date': reservation.check_in_date.strftime('%Y-%m-%d %H:%M:%S'),
+        'check_out_date': reservation.check_out_date.strftime('%Y-%m-%d %H:%M:%S'),
+    }
@@ -0,0 +1,232 @@
+import glob
+import json
+import os
+import threading
+import time
+from ipaddress import ip_address, ip_network
+
+from flask import Response, current_app, g, has_request_context, jsonify, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL = 1.0
+DEFAULT_ALLOWED_NETWORKS = '127.0.0.0/8,::1/128'
+
+
+class RouteStats:
+    __slots__ = ('count', 'buckets', 'latency', 'queries', 'db_time', 'serialize_time', 'bytes', 'statuses')
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.bytes = 0
+        self.statuses = {}
+
+    def to_json(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def merge(self, data):
+        self.count += data['count']
+        self.buckets = [a + b for a, b in zip(self.buckets, data['buckets'])]
+        self.latency += data['latency']
+        self.queries += data['queries']
+        self.db_time += data['db_time']
+        self.serialize_time += data['serialize_time']
+        self.bytes += data['bytes']
+        for status, count in data['statuses'].items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+
+class Registry:
+    """Per-process request metrics, optionally shared through a directory.
+
+    With a directory configured each process writes its totals to its own
+    file at most once per FLUSH_INTERVAL, and a scrape merges every file,
+    so /metrics reports all gunicorn workers whichever one answers it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.routes = {}
+        self.last_flush = 0.0
+
+    def record(self, key, status, latency, queries, db_time, serialize_time, size):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Forked from a preloaded parent: start from zero in this worker
+                self.reset()
+            stats = self.routes.get(key)
+            if stats is None:
+                stats = self.routes[key] = RouteStats()
+            stats.count += 1
+            stats.latency += latency
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    stats.buckets[i] += 1
+                    break
+            stats.queries += queries
+            stats.db_time += db_time
+            stats.serialize_time += serialize_time
+            stats.bytes += size
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {'|'.join(key): stats.to_json() for key, stats in self.routes.items()}
+
+    def flush(self, directory, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_flush < FLUSH_INTERVAL:
+            return
+        self.last_flush = now
+        path = worker_file(directory, os.getpid())
+        tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def collect(self, directory=None):
+        if not directory:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush(directory, force=True)
+            snapshots = []
+            for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        merged = {}
+        for snapshot in snapshots:
+            for key, data in snapshot.items():
+                merged.setdefault(tuple(key.split('|')), RouteStats()).merge(data)
+        return merged
+
+
+registry = Registry()
+
+
+def worker_file(directory, pid):
+    return os.path.join(directory, f'metrics-{pid}.json')
+
+
+def remove_worker_file(directory, pid):
+    """Drop an exited worker's totals, so scrapes stop counting a process that is gone."""
+    try:
+        os.remove(worker_file(directory, pid))
+    except FileNotFoundError:
+        pass
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    # On the execution context, not the connection: a statement that raises never
+    # reaches after_cursor_execute, and its start time has to go away with it
+    context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start
+    if has_request_context():
+        g.db_time = g.get('db_time', 0.0) + elapsed
+
+
+def add_serialization_time(seconds):
+    if has_request_context():
+        g.serialize_time = g.get('serialize_time', 0.0) + seconds
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render(routes):
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    family('http_requests_total', 'counter', 'Requests handled, by route, method and status.')
+    for (route, method), stats in sorted(routes.items()):
+        for status, count in sorted(stats.statuses.items()):
+            lines.append(f'http_requests_total{{route="{_escape(route)}",method="{method}",status="{status}"}} {count}')
+
+    family('http_request_duration_seconds', 'histogram', 'Request latency.')
+    for (route, method), stats in sorted(routes.items()):
+        labels = f'route="{_escape(route)}",method="{method}"'
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+            cumulative += count
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+        lines.append(f'http_request_duration_seconds_sum{{{labels}}} {stats.latency}')
+        lines.append(f'http_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+    for name, attr, help_text in (
+        ('http_request_sql_queries_total', 'queries', 'SQL statements executed while handling requests.'),
+        ('http_request_db_seconds_total', 'db_time', 'Time spent executing SQL statements.'),
+        ('http_request_serialization_seconds_total', 'serialize_time', 'Time spent serializing and compressing response bodies.'),
+        ('http_response_bytes_total', 'bytes', 'Response body bytes as sent, after compression (streamed bodies are not counted).'),
+    ):
+        family(name, 'counter', help_text)
+        for (route, method), stats in sorted(routes.items()):
+            lines.append(f'{name}{{route="{_escape(route)}",method="{method}"}} {getattr(stats, attr)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _from_allowed_network():
+    networks = current_app.config.get('METRICS_ALLOWED_NETWORKS', DEFAULT_ALLOWED_NETWORKS)
+    try:
+        address = ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    return any(address in ip_network(network.strip()) for network in networks.split(',') if network.strip())
+
+
+def init_metrics(app):
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        start = g.get('request_start')
+        if start is None or request.endpoint == 'metrics':
+            return response
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        registry.record(
+            (rule, request.method),
+            str(response.status_code),
+            time.perf_counter() - start,
+            g.get('query_count', 0),
+            g.get('db_time', 0.0),
+            g.get('serialize_time', 0.0),
+            0 if response.is_streamed else (response.content_length or 0),
+        )
+        directory = current_app.config.get('METRICS_DIR')
+        if directory:
+            registry.flush(directory)
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        # Scrapers on METRICS_ALLOWED_NETWORKS need no token; anyone else needs an admin one
+        if not _from_allowed_network():
+            verify_jwt_in_request()
+            if get_jwt().get('role') != 'admin':
+                return jsonify({'error': 'Forbidden'}), 403
+        routes = registry.collect(current_app.config.get('METRICS_DIR'))
+        return Response(render(routes), mimetype='text/plain; version=0.0.4')
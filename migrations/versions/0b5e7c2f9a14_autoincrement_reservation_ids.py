@@ -0,0 +1,45 @@
+"""autoincrement reservation ids
+
+Revision ID: 0b5e7c2f9a14
+Revises: 6e1a9c4d7b53
+Create Date: 2026-10-18 21:12:05.374112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b5e7c2f9a14'
+down_revision = '6e1a9c4d7b53'
+branch_labels = None
+depends_on = None
+
+
+def _recreate(autoincrement):
+    # SQLite only: AUTOINCREMENT is part of the table definition, so the table is
+    # rebuilt. Postgres sequences never hand out an id twice already.
+    with op.batch_alter_table(
+        'reservations', schema=None, recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement},
+    ):
+        pass
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _recreate(True)
+    # Start above every id handed out so far, archived ones included, even if
+    # the newest reservations have since been deleted
+    op.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = 'reservations'"))
+    op.execute(sa.text(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'reservations', max(id) FROM ("
+        "SELECT max(id) AS id FROM reservations UNION ALL SELECT max(id) FROM reservations_archive"
+        ") HAVING max(id) IS NOT NULL"
+    ))
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _recreate(False)
@@ -0,0 +1,25 @@
+"""add reservation room dates index
+
+Revision ID: 3f1c9a7e2b10
+Revises: 8d6af3be894a
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7e2b10'
+down_revision = '8d6af3be894a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reservations', schema=None) as batch_op:
+        batch_op.create_index('ix_reservations_room_dates', ['room_id', 'check_in_date', 'check_out_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reservations', schema=None) as batch_op:
+        batch_op.drop_index('ix_reservations_room_dates')
@@ -0,0 +1,28 @@
+"""add table versions
+
+Revision ID: 5a0d8c3e6f21
+Revises: b7e4d2a91c05
+Create Date: 2026-10-18 10:41:55.120377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a0d8c3e6f21'
+down_revision = 'b7e4d2a91c05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('table_versions',
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_versions')
@@ -0,0 +1,41 @@
+"""add room status schedule
+
+Revision ID: 6e1a9c4d7b53
+Revises: d3b8f1a6c092
+Create Date: 2026-10-18 18:02:37.918446
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1a9c4d7b53'
+down_revision = 'd3b8f1a6c092'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scheduler_clocks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('ticked_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    with op.batch_alter_table('reservations', schema=None) as batch_op:
+        batch_op.create_index('ix_reservations_check_in', ['check_in_date'], unique=False)
+        batch_op.create_index('ix_reservations_check_out', ['check_out_date'], unique=False)
+
+    with op.batch_alter_table('rooms', schema=None) as batch_op:
+        batch_op.create_index('ix_rooms_status', ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('rooms', schema=None) as batch_op:
+        batch_op.drop_index('ix_rooms_status')
+
+    with op.batch_alter_table('reservations', schema=None) as batch_op:
+        batch_op.drop_index('ix_reservations_check_out')
+        batch_op.drop_index('ix_reservations_check_in')
+
+    op.drop_table('scheduler_clocks')
@@ -0,0 +1,42 @@
+"""add reservations archive
+
+Revision ID: a9d4e6c2b817
+Revises: f7c3d1e9a248
+Create Date: 2026-10-18 16:05:41.220913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4e6c2b817'
+down_revision = 'f7c3d1e9a248'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reservations_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('check_in_date', sa.DateTime(), nullable=False),
+    sa.Column('check_out_date', sa.DateTime(), nullable=False),
+    sa.Column('total_price', sa.Integer(), nullable=False),
+    sa.Column('guest_id', sa.Integer(), nullable=False),
+    sa.Column('room_id', sa.Integer(), nullable=False),
+    sa.Column('room_type', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('reservations_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_reservations_archive_check_out', ['check_out_date'], unique=False)
+        batch_op.create_index('ix_reservations_archive_guest_dates', ['guest_id', 'check_in_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reservations_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_reservations_archive_guest_dates')
+        batch_op.drop_index('ix_reservations_archive_check_out')
+
+    op.drop_table('reservations_archive')
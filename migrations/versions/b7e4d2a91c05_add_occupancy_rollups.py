@@ -0,0 +1,30 @@
+"""add occupancy rollups
+
+Revision ID: b7e4d2a91c05
+Revises: 3f1c9a7e2b10
+Create Date: 2026-10-18 10:02:17.904512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e4d2a91c05'
+down_revision = '3f1c9a7e2b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('occupancy_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('room_type', sa.String(), nullable=False),
+    sa.Column('occupied_rooms', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'room_type')
+    )
+
+
+def downgrade():
+    op.drop_table('occupancy_rollups')
@@ -0,0 +1,64 @@
+"""add guest search index
+
+Revision ID: c41e7b9d0a36
+Revises: 5a0d8c3e6f21
+Create Date: 2026-10-18 11:26:08.551940
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7b9d0a36'
+down_revision = '5a0d8c3e6f21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # External-content FTS5 table over guests; the trigram tokenizer
+        # answers substring matches from the index. Triggers keep it in step
+        # with every write to guests, however it is made.
+        op.execute("""
+            CREATE VIRTUAL TABLE guests_search USING fts5(
+                name, email, phone, content='guests', content_rowid='id', tokenize='trigram'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER guests_search_ai AFTER INSERT ON guests BEGIN
+                INSERT INTO guests_search(rowid, name, email, phone)
+                VALUES (new.id, new.name, new.email, new.phone);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER guests_search_ad AFTER DELETE ON guests BEGIN
+                INSERT INTO guests_search(guests_search, rowid, name, email, phone)
+                VALUES ('delete', old.id, old.name, old.email, old.phone);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER guests_search_au AFTER UPDATE ON guests BEGIN
+                INSERT INTO guests_search(guests_search, rowid, name, email, phone)
+                VALUES ('delete', old.id, old.name, old.email, old.phone);
+                INSERT INTO guests_search(rowid, name, email, phone)
+                VALUES (new.id, new.name, new.email, new.phone);
+            END
+        """)
+        op.execute("INSERT INTO guests_search(guests_search) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in ('name', 'email', 'phone'):
+            op.execute(f'CREATE INDEX ix_guests_{column}_trgm ON guests USING gin ({column} gin_trgm_ops)')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('guests_search_ai', 'guests_search_ad', 'guests_search_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS guests_search')
+    elif dialect == 'postgresql':
+        for column in ('name', 'email', 'phone'):
+            op.execute(f'DROP INDEX IF EXISTS ix_guests_{column}_trgm')
@@ -0,0 +1,29 @@
+"""add rate overrides
+
+Revision ID: d3b8f1a6c092
+Revises: a9d4e6c2b817
+Create Date: 2026-10-18 17:12:09.584320
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b8f1a6c092'
+down_revision = 'a9d4e6c2b817'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rate_overrides',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('room_type', sa.String(), nullable=False),
+    sa.Column('price_per_night', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'room_type')
+    )
+
+
+def downgrade():
+    op.drop_table('rate_overrides')
@@ -0,0 +1,31 @@
+"""add change events
+
+Revision ID: f7c3d1e9a248
+Revises: e2f8a6b4c913
+Create Date: 2026-10-18 14:48:12.339051
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c3d1e9a248'
+down_revision = 'e2f8a6b4c913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.String(length=20), nullable=False),
+    sa.Column('action', sa.String(length=20), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('change_events')
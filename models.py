@@ -3,9 +3,15 @@ from sqlalchemy.orm import validates
 from sqlalchemy_serializer import SerializerMixin
 import re
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from engines import RoutingSession
+from hashing import hash_password, verify_password
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+ROOM_TYPES = ('single', 'double', 'suite')
+# dirty and cleaning are housekeeping states between a check-out and the next guest
+ROOM_STATUSES = ('available', 'occupied', 'dirty', 'cleaning', 'under_maintenance')
+USER_ROLES = ('admin', 'user', 'housekeeping')
 
 class Guest(db.Model, SerializerMixin):
     __tablename__ = 'guests'
@@ -45,6 +51,10 @@ class Guest(db.Model, SerializerMixin):
 
 class Rooms(db.Model, SerializerMixin):
     __tablename__ = 'rooms'
+    # Serves ?status= and the housekeeping list
+    __table_args__ = (
+        db.Index('ix_rooms_status', 'status'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     room_number = db.Column(db.Integer, nullable=False, unique=True)
@@ -60,13 +70,13 @@ class Rooms(db.Model, SerializerMixin):
     # Validations
     @validates('room_type')
     def validate_room_type(self, key, room_type):
-        if room_type not in ['single', 'double', 'suite']:
+        if room_type not in ROOM_TYPES:
             raise ValueError('Invalid room type')
         return room_type
 
     @validates('status')
     def validate_status(self, key, status):
-        if status not in ['available', 'occupied', 'under_maintenance']:
+        if status not in ROOM_STATUSES:
             raise ValueError('Invalid status')
         return status
 
@@ -76,6 +86,15 @@ class Rooms(db.Model, SerializerMixin):
 
 class Reservation(db.Model, SerializerMixin):
     __tablename__ = 'reservations'
+    # Serves the overlap check on bookings and the /rooms/available search;
+    # the date indexes give `flask room-status` the check-ins and check-outs due.
+    # AUTOINCREMENT so SQLite never reuses an id, which the archive may still hold.
+    __table_args__ = (
+        db.Index('ix_reservations_room_dates', 'room_id', 'check_in_date', 'check_out_date'),
+        db.Index('ix_reservations_check_in', 'check_in_date'),
+        db.Index('ix_reservations_check_out', 'check_out_date'),
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     check_in_date = db.Column(db.DateTime, nullable=False)
@@ -119,11 +138,101 @@ class User(db.Model, SerializerMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
-    role = db.Column(db.String(20), nullable=False)  # Role: 'admin' or 'user'
+    role = db.Column(db.String(20), nullable=False)  # Role: one of USER_ROLES
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return verify_password(self.password_hash, password)
+
+class OccupancyRollup(db.Model, SerializerMixin):
+    __tablename__ = 'occupancy_rollups'
+
+    # One row per night and room type, kept current by the reservation handlers
+    day = db.Column(db.Date, primary_key=True)
+    room_type = db.Column(db.String, primary_key=True)
+    occupied_rooms = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+
+
+class RateOverride(db.Model, SerializerMixin):
+    __tablename__ = 'rate_overrides'
+
+    # Nightly price for every room of a type on one date, in place of the
+    # rooms' own price_per_night
+    day = db.Column(db.Date, primary_key=True)
+    room_type = db.Column(db.String, primary_key=True)
+    price_per_night = db.Column(db.Integer, nullable=False)
+
+
+class TableVersion(db.Model, SerializerMixin):
+    __tablename__ = 'table_versions'
+
+    # Bumped in the same transaction as every write to the named table, so
+    # all worker processes see a change as soon as it commits
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class SchedulerClock(db.Model, SerializerMixin):
+    __tablename__ = 'scheduler_clocks'
+
+    # When each periodic task last ran; the next run picks up from there
+    name = db.Column(db.String(50), primary_key=True)
+    ticked_at = db.Column(db.DateTime, nullable=False)
+
+
+class Job(db.Model, SerializerMixin):
+    __tablename__ = 'jobs'
+    # Serves the worker's claim query
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    # Side effects queued in the same transaction as the write that causes
+    # them and run by `flask worker` once it has committed
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_at = db.Column(db.DateTime, nullable=False)
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+
+class ChangeEvent(db.Model, SerializerMixin):
+    __tablename__ = 'change_events'
+
+    # Append-only log of room and reservation changes, written in the same
+    # transaction as the change; the id is the /events cursor
+    id = db.Column(db.Integer, primary_key=True)
+    topic = db.Column(db.String(20), nullable=False)
+    action = db.Column(db.String(20), nullable=False)
+    data = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+
+class ArchivedReservation(db.Model, SerializerMixin):
+    __tablename__ = 'reservations_archive'
+    __table_args__ = (
+        # Guest history by date, and the newest archived stay
+        db.Index('ix_reservations_archive_guest_dates', 'guest_id', 'check_in_date'),
+        db.Index('ix_reservations_archive_check_out', 'check_out_date'),
+    )
+
+    # Stays moved out of `reservations` by `flask archive-reservations`. Rows
+    # keep their reservation id and the room's type at the time, and have no
+    # foreign keys, so history survives deleting the guest or the room
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    check_in_date = db.Column(db.DateTime, nullable=False)
+    check_out_date = db.Column(db.DateTime, nullable=False)
+    total_price = db.Column(db.Integer, nullable=False)
+    guest_id = db.Column(db.Integer, nullable=False)
+    room_id = db.Column(db.Integer, nullable=False)
+    room_type = db.Column(db.String)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
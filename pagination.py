@@ -0,0 +1,123 @@
+import base64
+import json
+import time
+
+from flask import Response, current_app, jsonify, request, stream_with_context, url_for
+from models import db
+from metrics import add_serialization_time
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+
+class PaginationError(ValueError):
+    pass
+
+
+# Cursors are opaque to clients: a urlsafe base64 blob of the last key seen
+def encode_cursor(row_id):
+    raw = json.dumps({'id': row_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(value['id'])
+    except (ValueError, KeyError, TypeError):
+        raise PaginationError('Invalid cursor')
+
+
+def page_args():
+    default = current_app.config.get('PAGE_SIZE_DEFAULT', DEFAULT_PAGE_SIZE)
+    maximum = current_app.config.get('PAGE_SIZE_MAX', MAX_PAGE_SIZE)
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be positive')
+    after = request.args.get('after')
+    return min(limit, maximum), decode_cursor(after) if after else None
+
+
+def keyset_page(model, query=None):
+    """Fetch one page of `model` ordered by id, starting after the request's cursor.
+
+    Returns the rows and the cursor for the next page (None on the last page).
+    """
+    limit, after_id = page_args()
+    query = query if query is not None else db.select(model)
+    query = query.order_by(model.id)
+    if after_id is not None:
+        query = query.where(model.id > after_id)
+    # Fetch one extra row to know whether another page exists
+    rows = db.session.execute(query.limit(limit + 1)).scalars().all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def next_link(next_cursor):
+    args = request.args.to_dict()
+    args['after'] = next_cursor
+    url = url_for(request.endpoint, _external=True, **(request.view_args or {}), **args)
+    return f'<{url}>; rel="next"'
+
+
+def page_response(rows, next_cursor, serialize):
+    start = time.perf_counter()
+    data = [serialize(row) for row in rows]
+    add_serialization_time(time.perf_counter() - start)
+    response = jsonify(data)
+    if next_cursor:
+        response.headers['Link'] = next_link(next_cursor)
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+def stream_format():
+    fmt = request.args.get('stream')
+    if fmt not in (None, 'json', 'ndjson'):
+        raise PaginationError("stream must be 'json' or 'ndjson'")
+    return fmt
+
+
+def stream_response(model, serialize, fmt, query=None):
+    """Stream every row of `model` from a server-side cursor as a JSON array or NDJSON."""
+    batch_size = current_app.config.get('STREAM_BATCH_SIZE', STREAM_BATCH_SIZE)
+    query = query if query is not None else db.select(model)
+    query = query.order_by(model.id).execution_options(yield_per=batch_size)
+    dumps = current_app.json.dumps
+
+    def generate():
+        result = db.session.execute(query).scalars()
+        try:
+            if fmt == 'ndjson':
+                for row in result:
+                    yield dumps(serialize(row)) + '\n'
+                return
+            yield '['
+            first = True
+            for row in result:
+                yield ('' if first else ',') + dumps(serialize(row))
+                first = False
+            yield ']\n'
+        finally:
+            result.close()
+
+    mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def list_response(model, serialize, query=None):
+    """Shared body of the list endpoints: stream when asked to, otherwise return one keyset page."""
+    try:
+        fmt = stream_format()
+        if fmt:
+            return stream_response(model, serialize, fmt, query)
+        rows, next_cursor = keyset_page(model, query)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    return page_response(rows, next_cursor, serialize)
@@ -0,0 +1,120 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from models import db, Rooms, RateOverride
+from availability import parse_range
+from response_cache import current_versions
+from serializers import DATETIME_FORMAT
+
+VERSION_TABLES = ('rooms', 'rate_overrides')
+DEFAULT_MAX_QUOTES = 1000
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def night_span(check_in, check_out):
+    """First and end (exclusive) night of a stay as date ordinals; a same-day stay is one night."""
+    first = check_in.date().toordinal()
+    return first, max(check_out.date().toordinal(), first + 1)
+
+
+class RateTable:
+    """Every room's nightly price and the per-date overrides for each room type.
+
+    Overrides are kept as sorted day ordinals with running price sums, so a
+    stay of any length is priced with two bisects, without walking its nights.
+    """
+
+    def __init__(self, rooms, overrides):
+        self.rooms = {room_id: (room_type, price) for room_id, room_type, price in rooms}
+        by_type = defaultdict(list)
+        for room_id, (room_type, price) in self.rooms.items():
+            by_type[room_type].append((price, room_id))
+        # Overrides apply to the whole type, so its cheapest room is cheapest on any dates
+        self.cheapest = {room_type: min(rooms)[1] for room_type, rooms in by_type.items()}
+        days, sums = defaultdict(list), defaultdict(lambda: [0])
+        for day, room_type, price in sorted(overrides):
+            days[room_type].append(day.toordinal())
+            sums[room_type].append(sums[room_type][-1] + price)
+        self.override_days = dict(days)
+        self.override_sums = dict(sums)
+
+    def price(self, room_id, first, last):
+        """Total for the nights from ordinal `first` up to, not including, `last`."""
+        room_type, nightly = self.rooms[room_id]
+        days = self.override_days.get(room_type)
+        if not days:
+            return nightly * (last - first)
+        lo, hi = bisect_left(days, first), bisect_left(days, last)
+        sums = self.override_sums[room_type]
+        return nightly * (last - first - (hi - lo)) + sums[hi] - sums[lo]
+
+    def quote(self, item):
+        if not isinstance(item, dict):
+            raise ValueError('Quote must be a JSON object')
+        # Types first, so a list or object in any field is this item's error rather than a 500
+        for key in ('check_in', 'check_out'):
+            if item.get(key) is not None and not isinstance(item[key], str):
+                raise ValueError(f'{key} must be a date string')
+        room_id = item.get('room_id')
+        if room_id is not None and (not isinstance(room_id, int) or isinstance(room_id, bool)):
+            raise ValueError('room_id must be an integer')
+        if item.get('room_type') is not None and not isinstance(item['room_type'], str):
+            raise ValueError('room_type must be a string')
+        check_in, check_out = parse_range(item.get('check_in'), item.get('check_out'))
+        if room_id is not None:
+            if room_id not in self.rooms:
+                raise ValueError('Room not found')
+        elif item.get('room_type'):
+            room_id = self.cheapest.get(item['room_type'])
+            if room_id is None:
+                raise ValueError(f"No rooms of type {item['room_type']!r}")
+        else:
+            raise ValueError('room_id or room_type is required')
+        first, last = night_span(check_in, check_out)
+        return {
+            'room_id': room_id,
+            'room_type': self.rooms[room_id][0],
+            'check_in': check_in.strftime(DATETIME_FORMAT),
+            'check_out': check_out.strftime(DATETIME_FORMAT),
+            'nights': last - first,
+            'total_price': self.price(room_id, first, last),
+        }
+
+
+def rate_table():
+    """The rate table for the current rooms and overrides, rebuilt only when either changes.
+
+    Costs one query (the table versions) while neither has changed.
+    """
+    versions = current_versions(VERSION_TABLES)
+    key = str(db.engine.url)
+    cached = _tables.get(key)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+    rooms = db.session.execute(db.select(Rooms.id, Rooms.room_type, Rooms.price_per_night)).all()
+    overrides = db.session.execute(
+        db.select(RateOverride.day, RateOverride.room_type, RateOverride.price_per_night)
+    ).all()
+    table = RateTable(rooms, overrides)
+    with _tables_lock:
+        _tables[key] = (versions, table)
+    return table
+
+
+def quote_stays(items):
+    """Price a batch of stays against one rate table; returns the quotes and per-item errors."""
+    table = rate_table()
+    quotes, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            quotes.append({'index': index, **table.quote(item)})
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+    return quotes, errors
+
+
+def stay_price(room_id, check_in, check_out):
+    return rate_table().price(room_id, *night_span(check_in, check_out))
@@ -0,0 +1,42 @@
+from functools import wraps
+
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def query_count():
+    return g.get('query_count', 0)
+
+
+def query_budget(max_queries):
+    """Declare how many SQL statements an endpoint may issue.
+
+    The count is always tracked; with QUERY_BUDGET_ENFORCE on (the default
+    when app.testing is set) going over the budget raises, so a stray lazy
+    load shows up as a failing request instead of a slow one.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            start = query_count()
+            response = view(*args, **kwargs)
+            used = query_count() - start
+            if used > max_queries and current_app.config.get('QUERY_BUDGET_ENFORCE', current_app.testing):
+                raise QueryBudgetExceeded(
+                    f'{view.__name__} issued {used} queries, budget is {max_queries}'
+                )
+            return response
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
@@ -0,0 +1,182 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from models import db, Rooms, Reservation, ArchivedReservation, OccupancyRollup
+from sqlutil import upsert_insert
+
+GROUPINGS = ('day', 'week', 'month', 'room_type')
+REBUILD_BATCH_SIZE = 5000
+INSERT_CHUNK_SIZE = 1000
+
+
+def nights(check_in, check_out):
+    """The dates whose night a stay covers; a same-day stay counts as one night."""
+    first, last = check_in.date(), check_out.date()
+    if last <= first:
+        return [first]
+    return [first + timedelta(days=n) for n in range((last - first).days)]
+
+
+def _accumulate(totals, stays, sign):
+    for room_type, check_in, check_out, total_price in stays:
+        days = nights(check_in, check_out)
+        nightly = total_price / len(days)
+        for day in days:
+            entry = totals[(day, room_type)]
+            entry[0] += sign
+            entry[1] += sign * nightly
+
+
+def _upsert(totals):
+    if not totals:
+        return
+    stmt = upsert_insert(OccupancyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['day', 'room_type'],
+        set_={
+            'occupied_rooms': OccupancyRollup.occupied_rooms + stmt.excluded.occupied_rooms,
+            'revenue': OccupancyRollup.revenue + stmt.excluded.revenue,
+        },
+    )
+    db.session.execute(stmt, [
+        {'day': day, 'room_type': room_type, 'occupied_rooms': count, 'revenue': revenue}
+        for (day, room_type), (count, revenue) in totals.items()
+    ])
+
+
+def record_stays(stays, sign=1):
+    """Add (sign=1) or remove (sign=-1) stays from the rollup in the current transaction.
+
+    `stays` are (room_type, check_in_date, check_out_date, total_price) tuples.
+    """
+    totals = defaultdict(lambda: [0, 0.0])
+    _accumulate(totals, stays, sign)
+    _upsert(totals)
+
+
+def record_reservations(reservations, sign=1):
+    reservations = list(reservations)
+    if not reservations:
+        return
+    room_ids = {r.room_id for r in reservations}
+    room_types = dict(db.session.execute(
+        db.select(Rooms.id, Rooms.room_type).where(Rooms.id.in_(room_ids))
+    ).all())
+    record_stays(
+        [(room_types[r.room_id], r.check_in_date, r.check_out_date, r.total_price)
+         for r in reservations if r.room_id in room_types],
+        sign,
+    )
+
+
+def retype_room(reservations, old_type, new_type):
+    """Move a room's stays from `old_type` to `new_type` in the rollup, for a room whose type changed."""
+    stays = [(r.check_in_date, r.check_out_date, r.total_price) for r in reservations]
+    record_stays([(old_type, *stay) for stay in stays], -1)
+    record_stays([(new_type, *stay) for stay in stays])
+
+
+def rebuild(batch_size=REBUILD_BATCH_SIZE):
+    """Recompute the whole rollup from the reservations table and its archive.
+
+    Reservations are read from a server-side cursor in batches and folded
+    into per-night totals by a plain Python loop (nothing here is
+    vectorized), so memory grows with the number of distinct nights and
+    room types, not with the number of reservations.
+    """
+    totals = defaultdict(lambda: [0, 0.0])
+    hot = (
+        db.select(Rooms.room_type, Reservation.check_in_date, Reservation.check_out_date, Reservation.total_price)
+        .join(Rooms, Reservation.room_id == Rooms.id)
+    )
+    # Archived stays keep the room type they had, even if the room is gone
+    archived = (
+        db.select(ArchivedReservation.room_type, ArchivedReservation.check_in_date,
+                  ArchivedReservation.check_out_date, ArchivedReservation.total_price)
+        .where(ArchivedReservation.room_type.is_not(None))
+    )
+    query = hot.union_all(archived).execution_options(yield_per=batch_size)
+    count = 0
+    for batch in db.session.execute(query).partitions():
+        _accumulate(totals, batch, 1)
+        count += len(batch)
+    db.session.execute(db.delete(OccupancyRollup))
+    rows = [
+        {'day': day, 'room_type': room_type, 'occupied_rooms': occupied, 'revenue': revenue}
+        for (day, room_type), (occupied, revenue) in sorted(totals.items())
+    ]
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(db.insert(OccupancyRollup), rows[start:start + INSERT_CHUNK_SIZE])
+    db.session.commit()
+    return count, len(rows)
+
+
+def parse_report_args(args):
+    try:
+        start = datetime.strptime(args['start'], '%Y-%m-%d').date() if args.get('start') else date.today()
+        end = datetime.strptime(args['end'], '%Y-%m-%d').date() if args.get('end') else start + timedelta(days=30)
+    except ValueError:
+        raise ValueError('Invalid date format. Expected YYYY-MM-DD.')
+    if end <= start:
+        raise ValueError('end must be after start')
+    group_by = args.get('group_by', 'day')
+    if group_by not in GROUPINGS:
+        raise ValueError(f"group_by must be one of {', '.join(GROUPINGS)}")
+    return start, end, group_by, args.get('room_type')
+
+
+def _group_key(day, room_type, group_by):
+    if group_by == 'day':
+        return day.isoformat()
+    if group_by == 'week':
+        year, week, _ = day.isocalendar()
+        return f'{year}-W{week:02d}'
+    if group_by == 'month':
+        return day.strftime('%Y-%m')
+    return room_type
+
+
+def _grouped(start, end, group_by, room_type):
+    """Sum rollup rows and room capacity for [start, end) into the requested groups."""
+    query = db.select(OccupancyRollup).where(OccupancyRollup.day >= start, OccupancyRollup.day < end)
+    capacity_query = db.select(Rooms.room_type, db.func.count()).group_by(Rooms.room_type)
+    if room_type:
+        query = query.where(OccupancyRollup.room_type == room_type)
+        capacity_query = capacity_query.where(Rooms.room_type == room_type)
+    capacity = dict(db.session.execute(capacity_query).all())
+
+    groups = defaultdict(lambda: {'occupied': 0, 'capacity': 0, 'revenue': 0.0})
+    day = start
+    while day < end:
+        for kind, rooms in capacity.items():
+            groups[_group_key(day, kind, group_by)]['capacity'] += rooms
+        day += timedelta(days=1)
+    for row in db.session.execute(query).scalars():
+        group = groups[_group_key(row.day, row.room_type, group_by)]
+        group['occupied'] += row.occupied_rooms
+        group['revenue'] += row.revenue
+    return sorted(groups.items())
+
+
+def occupancy_report(start, end, group_by, room_type=None):
+    return [
+        {
+            group_by: key,
+            'occupied_room_nights': g['occupied'],
+            'available_room_nights': g['capacity'],
+            'occupancy_rate': round(g['occupied'] / g['capacity'], 4) if g['capacity'] else None,
+        }
+        for key, g in _grouped(start, end, group_by, room_type)
+    ]
+
+
+def revenue_report(start, end, group_by, room_type=None):
+    return [
+        {
+            group_by: key,
+            'revenue': round(g['revenue'], 2),
+            'room_nights': g['occupied'],
+            'average_daily_rate': round(g['revenue'] / g['occupied'], 2) if g['occupied'] else None,
+        }
+        for key, g in _grouped(start, end, group_by, room_type)
+    ]
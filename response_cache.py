@@ -0,0 +1,121 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, request
+from encoding import response_mimetype
+from models import db, TableVersion
+from sqlutil import upsert_insert
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def bump_version(*tables):
+    """Mark tables as changed; call inside the transaction that changes them."""
+    stmt = upsert_insert(TableVersion)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['table_name'],
+        set_={'version': TableVersion.version + 1},
+    )
+    db.session.execute(stmt, [{'table_name': table, 'version': 1} for table in tables])
+
+
+def current_versions(tables):
+    rows = dict(db.session.execute(
+        db.select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+    ).all())
+    return tuple(rows.get(table, 0) for table in tables)
+
+
+class ResponseCache:
+    """A per-process LRU of rendered response bodies, bounded by entries and bytes.
+
+    Keys carry the table versions the response was built from, so a write
+    in any worker makes every worker's stale entries unreachable; they then
+    age out of the LRU.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        body = entry[0]
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+            self.entries[key] = entry
+            self.size += len(body)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted[0])
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+cache = ResponseCache()
+
+
+# Headers that describe the body itself are rebuilt on every hit
+_SKIP_HEADERS = {'content-length', 'content-type', 'etag'}
+
+
+def _respond(body, etag, mimetype, headers):
+    response = Response(body, mimetype=mimetype, headers=headers)
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def cached_response(*tables):
+    """Serve a GET view from the cache while `tables` are unchanged.
+
+    Responses carry a strong ETag, and a matching If-None-Match gets a 304
+    without touching anything but the version row.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('RESPONSE_CACHE_ENABLED', True):
+                return view(*args, **kwargs)
+            # Read the versions before the data so a concurrent write can
+            # only make the cached body newer than its key, never older
+            key = (
+                request.endpoint,
+                tuple(sorted((request.view_args or {}).items())),
+                tuple(sorted(request.args.items(multi=True))),
+                response_mimetype(),
+                current_versions(tables),
+            )
+            entry = cache.get(key)
+            if entry is not None:
+                return _respond(*entry)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            headers = [(k, v) for k, v in response.headers if k.lower() not in _SKIP_HEADERS]
+            entry = (body, etag, response.mimetype, headers)
+            cache.set(key, entry)
+            return _respond(*entry)
+        return wrapper
+    return decorator
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from models import db, User
+
+DEFAULT_CACHE_TTL = 60
+DEFAULT_CACHE_SIZE = 1024
+
+_MISSING = object()
+
+
+class PrincipalCache:
+    """A per-process LRU of username -> role, bounded by entries and age.
+
+    Users that don't exist are cached too (as None), so a deleted user's
+    token can't make every request query the users table. Changes made in
+    this process drop the entry at once; other processes see them once it
+    expires.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, username):
+        with self.lock:
+            entry = self.entries.get(username)
+            if entry is None:
+                return _MISSING
+            role, expires = entry
+            if expires <= time.monotonic():
+                del self.entries[username]
+                return _MISSING
+            self.entries.move_to_end(username)
+            return role
+
+    def set(self, username, role, ttl):
+        with self.lock:
+            self.entries[username] = (role, time.monotonic() + ttl)
+            self.entries.move_to_end(username)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, username):
+        with self.lock:
+            self.entries.pop(username, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+principals = PrincipalCache()
+
+
+def current_role(username):
+    """The user's role as the users table has it now (give or take the cache TTL); None if there's no such user."""
+    role = principals.get(username)
+    if role is _MISSING:
+        role = db.session.execute(db.select(User.role).where(User.username == username)).scalar()
+        principals.set(username, role, current_app.config.get('PRINCIPAL_CACHE_TTL', DEFAULT_CACHE_TTL))
+    return role
+
+
+def token_claims(user):
+    """Claims that go into the user's access tokens next to the username."""
+    return {'role': user.role}
+
+
+def roles_required(*roles, fresh=False):
+    """Like @jwt_required(), but only for tokens whose role is one of `roles`.
+
+    The role comes from the token's claims, so the check costs no query. With
+    `fresh`, it is looked up through the principal cache instead, so a role
+    change or a deleted user takes effect before the token expires.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            role = current_role(get_jwt_identity()) if fresh else get_jwt().get('role')
+            if role not in roles:
+                return jsonify({'error': 'Forbidden'}), 403
+            return current_app.ensure_sync(view)(*args, **kwargs)
+        return wrapper
+    return decorator
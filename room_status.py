@@ -0,0 +1,101 @@
+from datetime import datetime
+
+from models import db, Rooms, Reservation, SchedulerClock
+from changes import record_changes
+from response_cache import bump_version
+from serializers import get_plan
+
+CLOCK = 'room_status'
+UPDATE_CHUNK_SIZE = 500
+# Set by hand and never moved by the schedule
+MANUAL_STATUSES = ('under_maintenance',)
+# Housekeeping moves a room along this path; anything else is a PATCH
+HOUSEKEEPING = {
+    'dirty': ('cleaning', 'available'),
+    'cleaning': ('available',),
+}
+
+
+def _due(column, since, until):
+    # A range scan of the column's own index: only the boundaries crossed since the last tick
+    return db.select(Reservation.room_id).where(column > since, column <= until)
+
+
+def _rooms_in_stay(at, room_ids=None):
+    query = db.select(Reservation.room_id).where(Reservation.check_in_date <= at, Reservation.check_out_date > at)
+    if room_ids is not None:
+        query = query.where(Reservation.room_id.in_(room_ids))
+    return set(db.session.execute(query.distinct()).scalars())
+
+
+def due_transitions(since, until):
+    """Rooms to mark occupied and rooms vacated by `until`, from the check-ins and check-outs after `since`.
+
+    Also returns the vacated rooms whose whole stay fell in the window, so
+    they never showed as occupied. With no `since` there is nothing to go
+    back to, so every room is looked at and occupied rooms with nobody in
+    them count as vacated.
+    """
+    if since is None:
+        affected = None
+    else:
+        affected = set(db.session.execute(
+            _due(Reservation.check_in_date, since, until).union(_due(Reservation.check_out_date, since, until))
+        ).scalars())
+        if not affected:
+            return set(), set(), set()
+    occupied = _rooms_in_stay(until, affected)
+    if affected is None:
+        vacated = set(db.session.execute(db.select(Rooms.id).where(Rooms.status == 'occupied')).scalars())
+        return occupied, vacated - occupied, set()
+    vacated = affected - occupied
+    passed = set(db.session.execute(
+        db.select(Reservation.room_id).where(
+            Reservation.room_id.in_(vacated), Reservation.check_in_date > since, Reservation.check_out_date <= until,
+        ).distinct()
+    ).scalars()) if vacated else set()
+    return occupied, vacated, passed
+
+
+def _set_status(room_ids, status, condition):
+    room_ids = sorted(room_ids)
+    changed = []
+    for start in range(0, len(room_ids), UPDATE_CHUNK_SIZE):
+        changed += db.session.execute(
+            db.update(Rooms)
+            .where(Rooms.id.in_(room_ids[start:start + UPDATE_CHUNK_SIZE]), condition)
+            .values(status=status)
+            .returning(Rooms)
+        ).scalars().all()
+    return changed
+
+
+def tick(now=None):
+    """Apply the room status changes due since the last tick, in one transaction.
+
+    Rooms go to occupied at check-in and to dirty at check-out; housekeeping
+    takes them on from there. Returns how many rooms changed.
+    """
+    now = now or datetime.now()
+    clock = db.session.get(SchedulerClock, CLOCK, with_for_update=True)
+    since = clock.ticked_at if clock else None
+    if since is not None and since >= now:
+        db.session.rollback()
+        return 0
+    occupied, vacated, passed = due_transitions(since, now)
+    try:
+        changed = _set_status(occupied, 'occupied', Rooms.status.not_in(MANUAL_STATUSES + ('occupied',)))
+        changed += _set_status(vacated - passed, 'dirty', Rooms.status == 'occupied')
+        changed += _set_status(passed, 'dirty', Rooms.status.in_(('available', 'occupied')))
+        if clock is None:
+            db.session.add(SchedulerClock(name=CLOCK, ticked_at=now))
+        else:
+            clock.ticked_at = now
+        if changed:
+            record_changes('rooms', 'updated', [get_plan(Rooms, 'summary')(room) for room in changed])
+            bump_version('rooms')
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(changed)
@@ -0,0 +1,137 @@
+from models import db, Guest
+
+MIN_QUERY_LENGTH = 3
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+# Ranking looks at no more than this many index matches, so very common
+# substrings cost the same as rare ones
+CANDIDATE_LIMIT = 500
+
+# The FTS5 table from the guest search migration; not a model, so it is
+# never created by create_all
+guests_search = db.table('guests_search', db.column('rowid'), db.column('rank'))
+
+# Whether each engine's database has the FTS5 table, looked up once per engine
+_has_fts = {}
+
+
+def _fts_available(engine):
+    if engine not in _has_fts:
+        with engine.connect() as conn:
+            _has_fts[engine] = conn.execute(db.text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'guests_search'"
+            )).first() is not None
+    return _has_fts[engine]
+
+
+def _like_pattern(q):
+    return q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _prefix_first(q):
+    # Ranks guests whose name, email or phone starts with the query first
+    pattern = _like_pattern(q) + '%'
+    return db.case(
+        (db.or_(
+            Guest.name.ilike(pattern, escape='\\'),
+            Guest.email.ilike(pattern, escape='\\'),
+            Guest.phone.like(pattern, escape='\\'),
+        ), 0),
+        else_=1,
+    )
+
+
+def _sqlite_fts_query(q):
+    # The trigram tokenizer turns a quoted string into a substring match
+    match = '"' + q.replace('"', '""') + '"'
+    candidates = (
+        db.select(guests_search.c.rowid, guests_search.c.rank)
+        .where(db.literal_column('guests_search').op('MATCH')(match))
+        .limit(CANDIDATE_LIMIT)
+        .subquery()
+    )
+    query = db.select(Guest).join(candidates, candidates.c.rowid == Guest.id)
+    return query, (_prefix_first(q), candidates.c.rank, Guest.id)
+
+
+def _postgres_query(q):
+    # ILIKE '%q%' is answered by the pg_trgm GIN indexes
+    pattern = '%' + _like_pattern(q) + '%'
+    similarity = db.func.greatest(
+        db.func.similarity(Guest.name, q),
+        db.func.similarity(Guest.email, q),
+        db.func.similarity(Guest.phone, q),
+    )
+    query = db.select(Guest).where(db.or_(
+        Guest.name.ilike(pattern, escape='\\'),
+        Guest.email.ilike(pattern, escape='\\'),
+        Guest.phone.ilike(pattern, escape='\\'),
+    ))
+    return query, (_prefix_first(q), similarity.desc(), Guest.id)
+
+
+def _scan_query(q):
+    # No search index (e.g. a database built with create_all): plain scan
+    pattern = '%' + _like_pattern(q) + '%'
+    query = db.select(Guest).where(db.or_(
+        Guest.name.ilike(pattern, escape='\\'),
+        Guest.email.ilike(pattern, escape='\\'),
+        Guest.phone.like(pattern, escape='\\'),
+    ))
+    return query, (_prefix_first(q), Guest.id)
+
+
+def _phone_prefix(q):
+    return db.and_(Guest.phone >= q, Guest.phone < q + ':')
+
+
+def _ranked(query, order, source, limit):
+    # The first `limit` guest ids of one source with their place in its order
+    return (
+        query.with_only_columns(
+            Guest.id.label('id'),
+            db.literal(source).label('source'),
+            db.func.row_number().over(order_by=order).label('position'),
+        )
+        .order_by(*order)
+        .limit(limit)
+        .subquery()
+    )
+
+
+def _with_phone_prefix(q, query, order, limit):
+    # Digits are also looked up as a phone prefix: a range scan on the unique
+    # phone index, ranked ahead of the substring matches. The trigram
+    # candidates alone can miss them, since digits match nearly every phone.
+    sources = [
+        _ranked(db.select(Guest).where(_phone_prefix(q)), (Guest.phone,), 0, limit),
+        _ranked(query.where(db.not_(_phone_prefix(q))), order, 1, limit),
+    ]
+    merged = db.union_all(*(db.select(source) for source in sources)).subquery()
+    return (
+        db.select(Guest).join(merged, merged.c.id == Guest.id),
+        (merged.c.source, merged.c.position),
+    )
+
+
+def search_query(q, limit=DEFAULT_LIMIT):
+    """Guests whose name, email or phone contain `q`, prefix matches first.
+
+    An all-digit query also matches the start of a phone number, and those
+    guests come first.
+    """
+    q = (q or '').strip()
+    if len(q) < MIN_QUERY_LENGTH:
+        raise ValueError(f'q must be at least {MIN_QUERY_LENGTH} characters')
+    # Never below 1: SQLite reads LIMIT -1 as no limit at all
+    limit = max(1, min(limit, MAX_LIMIT))
+    engine = db.session.get_bind(Guest)
+    if engine.dialect.name == 'postgresql':
+        query, order = _postgres_query(q)
+    elif engine.dialect.name == 'sqlite' and _fts_available(engine):
+        query, order = _sqlite_fts_query(q)
+    else:
+        query, order = _scan_query(q)
+    if q.isdigit():
+        query, order = _with_phone_prefix(q, query, order, limit)
+    return query.order_by(*order).limit(limit)
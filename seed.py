@@ -1,71 +1,172 @@
-from app import app
-from models import db, Guest, Rooms, Reservation
+import argparse
+import math
+import random
+import time
 from datetime import datetime, timedelta
+from itertools import islice
 
-def seed_data():
-    with app.app_context():
-        # Delete existing data
-        db.session.query(Reservation).delete()
-        db.session.query(Rooms).delete()
-        db.session.query(Guest).delete()
-        db.session.commit()
+from app import create_app
+from models import db, Guest, Rooms, Reservation, ArchivedReservation, OccupancyRollup
+from reports import rebuild
+from response_cache import bump_version
 
-        # Seed guests
-        guests = [
-            Guest(name='Alice Kimani', email='alice@example.com', phone='123456789012'),
-            Guest(name='Bob Otieno', email='bob@example.com', phone='123456789013'),
-            Guest(name='Cynthia Mwangi', email='cynthia@example.com', phone='123456789014'),
-            Guest(name='Daniel Njoroge', email='daniel@example.com', phone='123456789015'),
-            Guest(name='Eve Wanjiku', email='eve@example.com', phone='123456789016'),
-            Guest(name='Frank Karanja', email='frank@example.com', phone='123456789017'),
-            Guest(name='Grace Muthoni', email='grace@example.com', phone='123456789018'),
-            Guest(name='Hassan Ahmed', email='hassan@example.com', phone='123456789019'),
-            Guest(name='Ivy Odhiambo', email='ivy@example.com', phone='123456789020'),
-            Guest(name='Jack Ochieng', email='jack@example.com', phone='123456789021')
-        ]
-        db.session.add_all(guests)
-        db.session.commit()
+app = create_app()
+
+# Presets for --scale; any count can still be overridden on its own
+SCALES = {
+    'small': {'rooms': 50, 'guests': 1000, 'reservations': 5000},
+    'medium': {'rooms': 200, 'guests': 100000, 'reservations': 1000000},
+    'large': {'rooms': 1000, 'guests': 1000000, 'reservations': 10000000},
+}
+
+FIRST_NAMES = ['Alice', 'Bob', 'Cynthia', 'Daniel', 'Eve', 'Frank', 'Grace', 'Hassan', 'Ivy', 'Jack',
+               'Kevin', 'Lucy', 'Mercy', 'Njeri', 'Otieno', 'Purity', 'Wanjiru', 'Brian', 'Faith', 'Collins']
+LAST_NAMES = ['Kimani', 'Otieno', 'Mwangi', 'Njoroge', 'Wanjiku', 'Karanja', 'Muthoni', 'Ahmed', 'Odhiambo',
+              'Ochieng', 'Kamau', 'Achieng', 'Mutua', 'Chebet', 'Kiprono', 'Wambui', 'Omondi', 'Nyambura']
+
+ROOM_TYPES = [('single', 0.5, 50), ('double', 0.35, 80), ('suite', 0.15, 150)]
+
+IMAGES = [
+    'https://images.unsplash.com/photo-1685592437742-3b56edb46b15?q=80&w=1470&auto=format&fit=crop&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D',
+    'https://images.unsplash.com/photo-1618773928121-c32242e63f39?q=80&w=1470&auto=format&fit=crop&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D',
+    'https://images.unsplash.com/photo-1644057501622-dfa7dd26dbfb?q=80&w=1381&auto=format&fit=crop&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D',
+    'https://images.unsplash.com/photo-1618773928121-c32242e63f39?w=500&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8MzZ8fGhvdGVsJTIwcm9vbXN8ZW58MHx8MHx8fDA%3D',
+    'https://plus.unsplash.com/premium_photo-1684445035187-c4bc7c96bc5d?w=500&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8NTN8fGhvdGVsJTIwcm9vbXN8ZW58MHx8MHx8fDA%3D',
+]
+
+# Stays last 1-14 nights, mostly short; rooms sit empty for a few days between
+# stays. Both are whole days drawn from exponential distributions.
+NIGHTS_SCALE = 2.0
+GAP_SCALE = 1.5
+FUTURE_DAYS = 180
+
+
+def _mean_whole_days(scale):
+    # Mean of floor(X) for X exponential with mean `scale`
+    return 1 / (math.exp(1 / scale) - 1)
+
+
+def generate_guests(rng, count):
+    now = datetime.now()
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            'id': i,
+            'name': f'{first} {last}',
+            'email': f'{first.lower()}.{last.lower()}.{i}@example.com',
+            'phone': f'{254700000000 + i:012d}',
+            'created_at': now,
+        }
+
+
+def generate_rooms(rng, count):
+    types = [t for t, _, _ in ROOM_TYPES]
+    weights = [w for _, w, _ in ROOM_TYPES]
+    base_price = {t: p for t, _, p in ROOM_TYPES}
+    now = datetime.now()
+    for i in range(1, count + 1):
+        room_type = rng.choices(types, weights)[0]
+        yield {
+            'id': i,
+            # 100 rooms per floor: 101, 102, ... 201, ...
+            'room_number': (i - 1) // 100 * 100 + 101 + (i - 1) % 100,
+            'room_type': room_type,
+            'price_per_night': int(base_price[room_type] * rng.uniform(0.9, 1.3)),
+            'status': 'under_maintenance' if rng.random() < 0.02 else 'available',
+            'image': rng.choice(IMAGES),
+            'created_at': now,
+        }
 
-        # Seed rooms with images
-        rooms = [
-            Rooms(room_number=101, room_type='single', price_per_night=50, status='available', image='https://images.unsplash.com/photo-1685592437742-3b56edb46b15?q=80&w=1470&auto=format&fit=crop&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D'),
-            Rooms(room_number=102, room_type='double', price_per_night=75, status='available', image='https://images.unsplash.com/photo-1618773928121-c32242e63f39?q=80&w=1470&auto=format&fit=crop&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D'),
-            Rooms(room_number=103, room_type='suite', price_per_night=150, status='occupied', image='https://images.unsplash.com/photo-1644057501622-dfa7dd26dbfb?q=80&w=1381&auto=format&fit=crop&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxwaG90by1wYWdlfHx8fGVufDB8fHx8fA%3D%3D'),
-            Rooms(room_number=104, room_type='single', price_per_night=55, status='available', image='https://images.unsplash.com/photo-1618773928121-c32242e63f39?w=500&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8MzZ8fGhvdGVsJTIwcm9vbXN8ZW58MHx8MHx8fDA%3D'),
-            Rooms(room_number=105, room_type='double', price_per_night=80, status='available', image='https://plus.unsplash.com/premium_photo-1684445035187-c4bc7c96bc5d?w=500&auto=format&fit=crop&q=60&ixlib=rb-4.0.3&ixid=M3wxMjA3fDB8MHxzZWFyY2h8NTN8fGhvdGVsJTIwcm9vbXN8ZW58MHx8MHx8fDA%3D')
-        ]
-        db.session.add_all(rooms)
+
+def generate_reservations(rng, rooms, guests, count):
+    """Back-to-back, never-overlapping stays per room, ending around FUTURE_DAYS from now."""
+    if not rooms:
+        return
+    per_room = count // len(rooms)
+    extra = count % len(rooms)
+    span = timedelta(days=round(per_room * (1 + _mean_whole_days(NIGHTS_SCALE) + _mean_whole_days(GAP_SCALE))))
+    start = datetime.now().replace(hour=14, minute=0, second=0, microsecond=0) + timedelta(days=FUTURE_DAYS) - span
+    for index, (room_id, price) in enumerate(rooms):
+        day = start
+        for _ in range(per_room + (1 if index < extra else 0)):
+            day += timedelta(days=int(rng.expovariate(1 / GAP_SCALE)))
+            nights = min(14, 1 + int(rng.expovariate(1 / NIGHTS_SCALE)))
+            check_out = day + timedelta(days=nights, hours=-3)
+            yield {
+                'check_in_date': day,
+                'check_out_date': check_out,
+                # Seasonal/discount noise around the rack rate
+                'total_price': int(price * nights * rng.uniform(0.85, 1.15)),
+                'guest_id': rng.randint(1, guests),
+                'room_id': room_id,
+                'created_at': day - timedelta(days=rng.randint(1, 60)),
+            }
+            day += timedelta(days=nights)
+
+
+def insert_chunks(model, rows, chunk_size):
+    table = model.__table__
+    total = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return total
+        db.session.connection().execute(table.insert(), chunk)
         db.session.commit()
+        total += len(chunk)
+
+
+def clear_data():
+    # Core deletes: no per-row ORM cascade work
+    for model in (Reservation, ArchivedReservation, Rooms, Guest, OccupancyRollup):
+        db.session.execute(db.delete(model))
+    db.session.commit()
+
+
+def seed_data(rooms=5, guests=10, reservations=3, seed=None, chunk_size=10000, reports=True):
+    rng = random.Random(seed)
+    with app.app_context():
+        started = time.perf_counter()
+        clear_data()
+
+        count = insert_chunks(Guest, generate_guests(rng, guests), chunk_size)
+        print(f'Seeded {count} guests')
+        count = insert_chunks(Rooms, generate_rooms(rng, rooms), chunk_size)
+        print(f'Seeded {count} rooms')
+        room_prices = db.session.execute(db.select(Rooms.id, Rooms.price_per_night).order_by(Rooms.id)).all()
+        count = insert_chunks(
+            Reservation, generate_reservations(rng, room_prices, guests, reservations), chunk_size
+        )
+        print(f'Seeded {count} reservations')
 
-        # Convert datetime to string in 'YYYY-MM-DD HH:MM:SS' format
-        def format_date(date_obj):
-            return date_obj.strftime('%Y-%m-%d %H:%M:%S')
-
-        # Seed reservations
-        reservations = [
-            Reservation(
-                check_in_date=format_date(datetime.now() + timedelta(days=5)),
-                check_out_date=format_date(datetime.now() + timedelta(days=10)),
-                total_price=200,
-                guest_id=guests[0].id,
-                room_id=rooms[0].id
-            ),
-            Reservation(
-                check_in_date=format_date(datetime.now() + timedelta(days=6)),
-                check_out_date=format_date(datetime.now() + timedelta(days=11)),
-                total_price=300,
-                guest_id=guests[1].id,
-                room_id=rooms[1].id
-            ),
-            Reservation(
-                check_in_date=format_date(datetime.now() + timedelta(days=7)),
-                check_out_date=format_date(datetime.now() + timedelta(days=12)),
-                total_price=400,
-                guest_id=guests[2].id,
-                room_id=rooms[2].id
-            )
-        ]
-        db.session.add_all(reservations)
+        bump_version('guests', 'rooms', 'reservations')
         db.session.commit()
+        if reports:
+            rebuild()
+            print('Rebuilt occupancy rollup')
+        if db.engine.dialect.name == 'sqlite':
+            db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        print(f'Done in {time.perf_counter() - started:.1f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill the database with synthetic hotel data.')
+    parser.add_argument('--scale', choices=sorted(SCALES), help='Preset sizes; individual counts override it')
+    parser.add_argument('--rooms', type=int)
+    parser.add_argument('--guests', type=int)
+    parser.add_argument('--reservations', type=int)
+    parser.add_argument('--seed', type=int, help='Random seed for a reproducible dataset')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--skip-reports', action='store_true', help="Don't rebuild the occupancy rollup")
+    args = parser.parse_args()
+
+    sizes = dict(SCALES[args.scale]) if args.scale else {'rooms': 5, 'guests': 10, 'reservations': 3}
+    for key in sizes:
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+    seed_data(**sizes, seed=args.seed, chunk_size=args.chunk_size, reports=not args.skip_reports)
+
 
-seed_data()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+from models import db
+
+
+def upsert_insert(model):
+    """An INSERT for `model` that supports on_conflict_do_update on SQLite and Postgres."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
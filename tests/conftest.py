@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models import db
+
+
+def app_config(path):
+    return {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'TESTING': True,
+        'JWT_SECRET_KEY': 'test-secret-key-of-at-least-32-bytes',
+    }
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(app_config(tmp_path / 'test.db'))
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def auth_headers(role='admin', identity=None):
+    token = create_access_token(identity=identity or role, additional_claims={'role': role})
+    return {'Authorization': f'Bearer {token}'}
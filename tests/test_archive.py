@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from archive import archive_batch
+from conftest import auth_headers
+from models import db, Guest, Rooms, Reservation, ArchivedReservation
+
+
+def stay(id, check_in, check_out):
+    return dict(id=id, check_in_date=check_in, check_out_date=check_out, total_price=100, guest_id=1, room_id=1)
+
+
+def test_archived_ids_are_never_reused(app, client):
+    db.session.add(Guest(id=1, name='Guest', email='g@example.com', phone='0' * 12))
+    db.session.add(Rooms(id=1, room_number=101, room_type='single', price_per_night=50, status='available', image=''))
+    db.session.execute(db.insert(Reservation), [
+        stay(1, datetime(2020, 1, 1, 14), datetime(2020, 1, 3, 10)),
+        stay(2, datetime(2020, 2, 1, 14), datetime(2020, 2, 3, 10)),
+        stay(3, datetime(2099, 1, 1, 14), datetime(2099, 1, 3, 10)),
+        stay(4, datetime(2099, 2, 1, 14), datetime(2099, 2, 3, 10)),
+    ])
+    db.session.commit()
+    assert archive_batch(datetime(2021, 1, 1)) == 2
+    # Drop the newest hot rows, so max(id) + 1 would hand out an archived id
+    db.session.execute(db.delete(Reservation).where(Reservation.id.in_((3, 4))))
+    db.session.commit()
+
+    headers = auth_headers()
+    response = client.post('/reservations', headers=headers, json={
+        'guest_id': 1, 'room_id': 1, 'check_in_date': '2099-03-01 14:00:00', 'check_out_date': '2099-03-03 10:00:00',
+    })
+    assert response.status_code == 201, response.get_json()
+
+    hot = set(db.session.execute(db.select(Reservation.id)).scalars())
+    archived = set(db.session.execute(db.select(ArchivedReservation.id)).scalars())
+    assert archived == {1, 2}
+    assert hot and hot.isdisjoint(archived) and min(hot) > 4
+
+    history = client.get('/guests/1/reservations', headers=headers).get_json()
+    ids = [row['id'] for row in history]
+    assert len(ids) == len(set(ids)) == 3
+
+    # Archiving the new booking too must not hit the archive's primary key
+    assert archive_batch(datetime(2100, 1, 1)) == 1
@@ -0,0 +1,29 @@
+from conftest import auth_headers
+from models import db, User
+
+
+def test_first_user_is_always_an_admin(client):
+    response = client.post('/register', json={'username': 'first', 'password': 'pw', 'role': 'housekeeping'})
+    assert response.status_code == 201
+    assert db.session.execute(db.select(User.role).where(User.username == 'first')).scalar() == 'admin'
+    # After that, registering needs an admin
+    response = client.post('/register', json={'username': 'second', 'password': 'pw'})
+    assert response.status_code == 401
+
+
+def test_last_admin_cannot_be_demoted_or_deleted(client):
+    client.post('/register', json={'username': 'root', 'password': 'pw'})
+    headers = auth_headers('admin', identity='root')
+    root = db.session.execute(db.select(User.id).where(User.username == 'root')).scalar()
+
+    response = client.patch(f'/users/{root}', json={'role': 'user'}, headers=headers)
+    assert response.status_code == 409
+    assert client.delete(f'/users/{root}', headers=headers).status_code == 409
+
+    response = client.post('/register', json={'username': 'ops', 'password': 'pw', 'role': 'admin'}, headers=headers)
+    assert response.status_code == 201
+    response = client.patch(f'/users/{root}', json={'role': 'user'}, headers=headers)
+    assert response.status_code == 200
+    ops = db.session.execute(db.select(User.id).where(User.username == 'ops')).scalar()
+    assert client.delete(f'/users/{ops}', headers=auth_headers('admin', identity='ops')).status_code == 409
+    assert db.session.execute(db.select(User.username).where(User.role == 'admin')).scalars().all() == ['ops']
@@ -0,0 +1,54 @@
+import multiprocessing
+import time
+from collections import Counter
+
+import booking
+from app import create_app
+from conftest import app_config, auth_headers
+from models import db, Guest, Rooms, Reservation
+
+CLIENTS = 8
+
+
+def _book(path, i, barrier, results):
+    # Its own process and app, like a gunicorn worker, so only the database lock stands between them
+    app = create_app(app_config(path))
+    with app.app_context():
+        headers = auth_headers()
+    # Every stay overlaps every other one, each by a different amount
+    body = {
+        'guest_id': 1, 'room_id': 1,
+        'check_in_date': f'2030-01-10 {10 + i:02d}:00:00', 'check_out_date': f'2030-01-12 {10 + i:02d}:00:00',
+    }
+    barrier.wait()
+    results.put(app.test_client().post('/reservations', json=body, headers=headers).status_code)
+
+
+def test_concurrent_overlapping_bookings_only_one_wins(app, tmp_path, monkeypatch):
+    db.session.add(Guest(id=1, name='Guest', email='g@example.com', phone='0' * 12))
+    db.session.add(Rooms(id=1, room_number=101, room_type='single', price_per_night=50, status='available', image=''))
+    db.session.commit()
+
+    # Hold each booking between its overlap check and its insert, so without
+    # the lock every client would pass the check before any of them inserts
+    is_booked = booking.is_booked
+
+    def slow_is_booked(*args):
+        booked = is_booked(*args)
+        time.sleep(0.05)
+        return booked
+    monkeypatch.setattr(booking, 'is_booked', slow_is_booked)
+
+    context = multiprocessing.get_context('fork')
+    barrier, results = context.Barrier(CLIENTS), context.Queue()
+    processes = [
+        context.Process(target=_book, args=(tmp_path / 'test.db', i, barrier, results)) for i in range(CLIENTS)
+    ]
+    for process in processes:
+        process.start()
+    statuses = Counter(results.get(timeout=60) for _ in processes)
+    for process in processes:
+        process.join()
+
+    assert statuses == {201: 1, 409: CLIENTS - 1}
+    assert db.session.execute(db.select(db.func.count()).select_from(Reservation)).scalar() == 1
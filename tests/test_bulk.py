@@ -0,0 +1,29 @@
+from conftest import auth_headers
+from models import db, Guest, Rooms, Reservation
+
+
+def test_reservation_rows_with_bad_ids_fail_alone(client):
+    db.session.add(Guest(id=1, name='Guest', email='g@example.com', phone='0' * 12))
+    db.session.add(Rooms(id=1, room_number=101, room_type='single', price_per_night=50, status='available', image=''))
+    db.session.commit()
+    stay = {'check_in_date': '2030-01-01 14:00:00', 'check_out_date': '2030-01-03 10:00:00'}
+    rows = [
+        {**stay, 'room_id': [1], 'guest_id': 1},
+        {**stay, 'room_id': 1, 'guest_id': {'id': 1}},
+        {**stay, 'room_id': True, 'guest_id': 1},
+        {**stay, 'room_id': 1, 'guest_id': 1},
+    ]
+    response = client.post('/reservations/bulk', json=rows, headers=auth_headers())
+    assert response.status_code == 201
+    assert response.get_json() == {'inserted': 1, 'errors': [
+        {'index': 0, 'error': 'room_id must be an integer'},
+        {'index': 1, 'error': 'guest_id must be an integer'},
+        {'index': 2, 'error': 'room_id must be an integer'},
+    ]}
+    assert db.session.execute(db.select(Reservation.total_price)).scalars().all() == [100]
+
+
+def test_chunk_size_must_be_an_integer(client):
+    response = client.post('/guests/bulk?chunk_size=abc', json=[], headers=auth_headers())
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'chunk_size must be an integer'}
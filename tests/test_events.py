@@ -0,0 +1,21 @@
+import changes
+from conftest import auth_headers
+
+
+def test_streams_past_the_cap_get_503(app, client):
+    app.config['EVENTS_MAX_STREAMS'] = 2
+    headers = auth_headers()
+    open_streams = [client.get('/events', headers=headers) for _ in range(2)]
+    assert [response.status_code for response in open_streams] == [200, 200]
+
+    busy = client.get('/events', headers=headers)
+    assert busy.status_code == 503
+    assert busy.headers['Retry-After'] == str(changes.DEFAULT_RETRY_AFTER)
+
+    # Closing a stream, read or not, frees its slot (last opened first: they share this thread's contexts)
+    for response in reversed(open_streams):
+        response.close()
+    assert changes._streams == 0
+    response = client.get('/events', headers=headers)
+    assert response.status_code == 200
+    response.close()
@@ -0,0 +1,25 @@
+import json
+
+from conftest import auth_headers
+from metrics import RouteStats, registry, remove_worker_file
+
+REMOTE = {'REMOTE_ADDR': '203.0.113.7'}
+
+
+def test_metrics_open_to_allowed_networks_only(client):
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base=REMOTE).status_code == 401
+    assert client.get('/metrics', environ_base=REMOTE, headers=auth_headers('user')).status_code == 403
+    assert client.get('/metrics', environ_base=REMOTE, headers=auth_headers('admin')).status_code == 200
+
+
+def test_exited_worker_file_is_dropped(app, tmp_path):
+    directory = tmp_path / 'metrics'
+    directory.mkdir()
+    stats = RouteStats()
+    stats.count = 5
+    (directory / 'metrics-999999.json').write_text(json.dumps({'/gone|GET': stats.to_json()}))
+    assert ('/gone', 'GET') in registry.collect(str(directory))
+    remove_worker_file(str(directory), 999999)
+    remove_worker_file(str(directory), 999999)
+    assert ('/gone', 'GET') not in registry.collect(str(directory))
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import auth_headers
+from models import db, Guest, Rooms, Reservation
+from query_budget import QueryBudgetExceeded, query_budget
+
+
+@pytest.fixture
+def data(app):
+    db.session.execute(db.insert(Guest), [
+        dict(id=i, name=f'Guest {i}', email=f'guest{i}@example.com', phone=f'{i:012d}') for i in range(1, 4)
+    ])
+    db.session.execute(db.insert(Rooms), [
+        dict(id=i, room_number=100 + i, room_type='single', price_per_night=50, status='available', image='')
+        for i in range(1, 4)
+    ])
+    start = datetime(2030, 1, 1, 14)
+    db.session.execute(db.insert(Reservation), [
+        dict(id=i, check_in_date=start + timedelta(days=3 * i), check_out_date=start + timedelta(days=3 * i + 2),
+             total_price=100, guest_id=i % 3 + 1, room_id=i % 3 + 1)
+        for i in range(1, 10)
+    ])
+    db.session.commit()
+
+
+@pytest.mark.parametrize('path', [
+    '/guests?include=reservations.rooms',
+    '/guests/1?include=reservations.rooms',
+    '/rooms?include=reservations.guests',
+    '/rooms/1?include=reservations.guests',
+    '/reservations?include=guests,rooms',
+    '/reservations/1?include=guests,rooms',
+    '/guests',
+    '/rooms/1',
+    '/reservations',
+])
+def test_read_endpoints_stay_within_budget(client, data, path):
+    # TESTING turns QUERY_BUDGET_ENFORCE on, so an extra query fails the request by raising
+    response = client.get(path, headers=auth_headers())
+    assert response.status_code == 200, response.get_json()
+
+
+def test_lazy_load_over_budget_raises(app, client, data):
+    @app.route('/over-budget')
+    @query_budget(1)
+    def over_budget():
+        guest = db.session.get(Guest, 1)
+        return {'reservations': len(guest.reservations)}
+
+    with pytest.raises(QueryBudgetExceeded, match='over_budget issued 2 queries, budget is 1'):
+        client.get('/over-budget')
@@ -0,0 +1,27 @@
+from conftest import auth_headers
+from models import db, Rooms
+
+
+def test_malformed_items_are_per_item_errors(client):
+    db.session.add(Rooms(id=1, room_number=101, room_type='single', price_per_night=50, status='available', image=''))
+    db.session.commit()
+    dates = {'check_in': '2030-01-01', 'check_out': '2030-01-03'}
+    items = [
+        {**dates, 'room_id': [1]},
+        {**dates, 'room_type': ['single']},
+        {'check_in': 20300101, 'check_out': '2030-01-03', 'room_id': 1},
+        {'check_in': '2030-01-01', 'check_out': {'day': 3}, 'room_id': 1},
+        {**dates, 'room_id': True},
+        {**dates, 'room_id': 1},
+    ]
+    response = client.post('/quotes', json=items, headers=auth_headers())
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['errors'] == [
+        {'index': 0, 'error': 'room_id must be an integer'},
+        {'index': 1, 'error': 'room_type must be a string'},
+        {'index': 2, 'error': 'check_in must be a date string'},
+        {'index': 3, 'error': 'check_out must be a date string'},
+        {'index': 4, 'error': 'room_id must be an integer'},
+    ]
+    assert [(quote['index'], quote['total_price']) for quote in body['quotes']] == [(5, 100)]
@@ -0,0 +1,35 @@
+from conftest import auth_headers
+from models import db, Guest, Rooms, OccupancyRollup
+from reports import rebuild
+
+
+def rollup():
+    return sorted(
+        (row.day, row.room_type, row.occupied_rooms, round(row.revenue, 2))
+        for row in db.session.execute(db.select(OccupancyRollup)).scalars()
+        if row.occupied_rooms
+    )
+
+
+def test_room_type_change_moves_its_stays_in_the_rollup(client):
+    db.session.add(Guest(id=1, name='Guest', email='g@example.com', phone='0' * 12))
+    db.session.add_all([
+        Rooms(id=i, room_number=100 + i, room_type='single', price_per_night=50, status='available', image='')
+        for i in (1, 2)
+    ])
+    db.session.commit()
+    headers = auth_headers()
+    for room_id, check_in, check_out in ((1, '01', '03'), (1, '05', '07'), (2, '02', '04')):
+        response = client.post('/reservations', headers=headers, json={
+            'guest_id': 1, 'room_id': room_id,
+            'check_in_date': f'2030-01-{check_in} 14:00:00', 'check_out_date': f'2030-01-{check_out} 10:00:00',
+        })
+        assert response.status_code == 201, response.get_json()
+
+    response = client.patch('/rooms/1', headers=headers, json={'room_type': 'double'})
+    assert response.status_code == 200, response.get_json()
+    incremental = rollup()
+    assert {room_type for _, room_type, _, _ in incremental} == {'single', 'double'}
+
+    rebuild()
+    assert incremental == rollup()
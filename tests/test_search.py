@@ -0,0 +1,33 @@
+import pytest
+
+from conftest import auth_headers
+from models import db, Guest
+from search import MAX_LIMIT
+
+
+@pytest.fixture
+def guests(app):
+    db.session.execute(db.insert(Guest), [
+        dict(id=i, name=f'Guest {i}', email=f'guest{i}@example.com', phone=f'{120255500000 + i}') for i in range(1, 81)
+    ])
+    db.session.commit()
+
+
+@pytest.mark.parametrize('limit, expected', [('-1', 1), ('0', 1), ('5', 5), ('1000', MAX_LIMIT)])
+def test_limit_is_clamped(client, guests, limit, expected):
+    response = client.get(f'/guests/search?q=Guest&limit={limit}', headers=auth_headers())
+    assert response.status_code == 200
+    assert len(response.get_json()) == expected
+
+
+def test_limit_must_be_an_integer(client, guests):
+    response = client.get('/guests/search?q=Guest&limit=abc', headers=auth_headers())
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'limit must be an integer'}
+
+
+def test_digits_match_inside_phone_numbers(client, guests):
+    response = client.get('/guests/search?q=555&limit=3', headers=auth_headers())
+    assert [guest['id'] for guest in response.get_json()] == [1, 2, 3]
+    response = client.get('/guests/search?q=12025550001&limit=50', headers=auth_headers())
+    assert [guest['id'] for guest in response.get_json()] == list(range(10, 20))
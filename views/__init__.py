@@ -0,0 +1,8 @@
+from views import auth, events, export, guests, quotes, reports, reservations, rooms
+
+BLUEPRINTS = (auth.bp, guests.bp, rooms.bp, reservations.bp, quotes.bp, events.bp, reports.bp, export.bp)
+
+
+def register_blueprints(app):
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
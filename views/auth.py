@@ -0,0 +1,106 @@
+from flask import Blueprint, request, make_response, jsonify
+from flask_jwt_extended import create_access_token, get_jwt_identity, verify_jwt_in_request
+from models import db, User, USER_ROLES
+from roles import current_role, principals, roles_required, token_claims
+from hashing import HashPoolFull, hash_password, verify_password
+
+bp = Blueprint('auth', __name__)
+
+@bp.app_errorhandler(HashPoolFull)
+def hash_pool_full(e):
+    response = jsonify({'error': str(e)})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+# User Registration (Admin only)
+@bp.route('/register', methods=['POST'])
+def register_user():
+    # Open until the first user exists, and that one is always an admin
+    bootstrap = db.session.execute(db.select(User.id).limit(1)).first() is None
+    if not bootstrap:
+        verify_jwt_in_request()
+        if current_role(get_jwt_identity()) != 'admin':
+            return jsonify({"error": "Only admins can register new users"}), 403
+
+    data = request.get_json()
+    username = data.get('username')
+    password = data.get('password')
+    role = 'admin' if bootstrap else data.get('role','user')
+
+    if not username or not password or not role:
+        return jsonify({"error": "Missing data"}), 400
+
+    if role not in USER_ROLES:
+        return jsonify({"error": f"role must be one of {', '.join(USER_ROLES)}"}), 400
+
+    if User.query.filter_by(username=username).first():
+        return jsonify({"error": "Username already exists"}), 400
+
+    new_user = User(username=username, role=role, password_hash=hash_password(password))
+
+    db.session.add(new_user)
+    db.session.commit()
+    principals.invalidate(username)
+
+    return jsonify({"message": "User created successfully"}), 201
+
+# User Login
+@bp.route('/login', methods=['POST'])
+def login():
+    data = request.get_json()
+    username = data.get('username')
+    password = data.get('password')
+
+    user = User.query.filter_by(username=username).first()
+
+    if not user or not verify_password(user.password_hash, password):
+        return jsonify({"error": "Invalid username or password"}), 401
+
+    access_token = create_access_token(identity=username, additional_claims=token_claims(user))
+    return jsonify(access_token=access_token), 200
+
+def _last_admin(user):
+    # Locks the admin rows where the database can, so two admins can't demote each other at once
+    if user.role != 'admin':
+        return False
+    admins = db.session.execute(db.select(User.id).where(User.role == 'admin').with_for_update()).all()
+    return len(admins) <= 1
+
+# User management
+@bp.route('/users', methods=['GET'])
+@roles_required('admin', fresh=True)
+def get_users():
+    users = db.session.execute(db.select(User.id, User.username, User.role).order_by(User.id)).all()
+    return jsonify([{'id': id, 'username': username, 'role': role} for id, username, role in users]), 200
+
+@bp.route('/users/<int:id>', methods=['PATCH'])
+@roles_required('admin', fresh=True)
+def update_user(id):
+    user = db.session.get(User, id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    role = (request.get_json(silent=True) or {}).get('role')
+    if role not in USER_ROLES:
+        return jsonify({"error": f"role must be one of {', '.join(USER_ROLES)}"}), 400
+    if role != 'admin' and _last_admin(user):
+        db.session.rollback()
+        return jsonify({'error': "Can't demote the last admin"}), 409
+    user.role = role
+    db.session.commit()
+    principals.invalidate(user.username)
+    return jsonify({'id': user.id, 'username': user.username, 'role': user.role}), 200
+
+@bp.route('/users/<int:id>', methods=['DELETE'])
+@roles_required('admin', fresh=True)
+def delete_user(id):
+    user = db.session.get(User, id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    if _last_admin(user):
+        db.session.rollback()
+        return jsonify({'error': "Can't delete the last admin"}), 409
+    username = user.username
+    db.session.delete(user)
+    db.session.commit()
+    principals.invalidate(username)
+    return make_response({'message': 'User deleted'}, 202)
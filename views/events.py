@@ -0,0 +1,34 @@
+from flask import Blueprint, Response, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
+from changes import FeedBusy, claim_stream, event_stream, parse_stream_args, release_stream
+
+bp = Blueprint('events', __name__)
+
+@bp.app_errorhandler(FeedBusy)
+def feed_busy(e):
+    response = jsonify({'error': str(e)})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+# Change feed
+@bp.route('/events', methods=['GET'])
+# EventSource can't set headers, so the token may also come as ?jwt=
+@jwt_required(locations=['headers', 'query_string'])
+def events():
+    try:
+        topics, since = parse_stream_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # Capped so open streams can't take every thread the API needs; the slot
+    # is given back when the response closes, read to the end or not
+    claim_stream()
+    try:
+        response = Response(stream_with_context(event_stream(topics, since)), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        response.call_on_close(release_stream)
+    except BaseException:
+        release_stream()
+        raise
+    return response
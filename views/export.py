@@ -0,0 +1,32 @@
+from flask import Blueprint, request, jsonify
+from roles import roles_required
+from export import ExportBusy, export_response, guest_export, parse_export_args, reservation_export
+
+bp = Blueprint('export', __name__)
+
+@bp.app_errorhandler(ExportBusy)
+def export_busy(e):
+    response = jsonify({'error': str(e)})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+# Bulk export
+@bp.route('/export/reservations', methods=['GET'])
+@roles_required('admin')
+def export_reservations():
+    try:
+        fmt, chunk_size, gzip = parse_export_args(request.args)
+        columns, queries = reservation_export(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return export_response('reservations', columns, queries, fmt, chunk_size, gzip)
+
+@bp.route('/export/guests', methods=['GET'])
+@roles_required('admin')
+def export_guests():
+    try:
+        fmt, chunk_size, gzip = parse_export_args(request.args)
+        columns, queries = guest_export(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return export_response('guests', columns, queries, fmt, chunk_size, gzip)
@@ -0,0 +1,133 @@
+from flask import Blueprint, request, make_response, jsonify
+from flask_jwt_extended import jwt_required
+from roles import roles_required
+from models import db, Guest
+from pagination import list_response
+from serializers import get_plan, plan_from_args
+from query_budget import query_budget
+from search import DEFAULT_LIMIT, search_query
+from availability import parse_date
+from archive import guest_history
+from reports import record_reservations
+from response_cache import bump_version
+from changes import record_changes
+from bulk import ModelImporter, bulk_import
+
+bp = Blueprint('guests', __name__)
+
+# CRUD for Guests
+@bp.route('/guests', methods=['GET'])
+@jwt_required()
+@query_budget(2)
+def get_guests():
+    try:
+        plan = plan_from_args(Guest, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return list_response(Guest, plan, db.select(Guest).options(*plan.load_options()))
+
+@bp.route('/guests/search', methods=['GET'])
+@jwt_required()
+# One search query, plus a check for the FTS table on a process's first search
+@query_budget(2)
+def search_guests():
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    try:
+        query = search_query(request.args.get('q'), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    plan = get_plan(Guest, 'summary')
+    guests = db.session.execute(query.options(*plan.load_options())).scalars()
+    return jsonify([plan(guest) for guest in guests]), 200
+
+@bp.route('/guests/<int:id>', methods=['GET'])
+@jwt_required()
+@query_budget(2)
+def get_guest(id):
+    try:
+        plan = plan_from_args(Guest, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    guest = db.session.get(Guest, id, options=plan.load_options())
+    if guest:
+        return make_response(jsonify(plan(guest)), 200)
+    return jsonify({'error': 'Guest not found'}), 404
+
+@bp.route('/guests/<int:id>/reservations', methods=['GET'])
+@jwt_required()
+# The guest, the archive's newest stay, and the (possibly unioned) history
+@query_budget(3)
+def get_guest_history(id):
+    try:
+        start = parse_date(request.args['start'], 'start') if request.args.get('start') else None
+        end = parse_date(request.args['end'], 'end') if request.args.get('end') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not db.session.get(Guest, id):
+        return jsonify({'error': 'Guest not found'}), 404
+    return jsonify(guest_history(id, start, end)), 200
+
+@bp.route('/guests', methods=['POST'])
+@roles_required('admin', 'user')
+def create_guest():
+    data = request.get_json()
+    # print("getting data...",data)
+    try:
+        new_guest = Guest(
+            name=data['name'],
+            email=data['email'],
+            phone=data['phone']
+        )
+        db.session.add(new_guest)
+        bump_version('guests')
+        db.session.commit()
+        return make_response(jsonify(get_plan(Guest)(new_guest)), 201)
+    except Exception as e:
+        # print("Getting error",str(e))
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/guests/bulk', methods=['POST'])
+@roles_required('admin')
+def bulk_create_guests():
+    return bulk_import(ModelImporter(Guest))
+
+@bp.route('/guests/<int:id>', methods=['PATCH'], endpoint='update_guest')
+@roles_required('admin', 'user')
+def update_guest(id):
+    guest = db.session.get(Guest, id)
+    if not guest:
+        return jsonify({'error': 'Guest not found'}), 404
+
+    data = request.get_json()
+    if 'name' in data:
+        guest.name = data['name']
+    if 'email' in data:
+        try:
+            guest.email = data['email']
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    if 'phone' in data:
+        try:
+            guest.phone = data['phone']
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    bump_version('guests')
+    db.session.commit()
+    return make_response(jsonify(get_plan(Guest)(guest)), 200)
+
+@bp.route('/guests/<int:id>', methods=['DELETE'])
+@roles_required('admin', 'user')
+def delete_guest(id):
+    guest = db.session.get(Guest, id)
+    if not guest:
+        return jsonify({'error': 'Guest not found'}), 404
+    record_reservations(guest.reservations, -1)
+    record_changes('reservations', 'deleted', [{'id': r.id, 'room_id': r.room_id} for r in guest.reservations])
+    db.session.delete(guest)
+    bump_version('guests', 'reservations')
+    db.session.commit()
+    return make_response({'message': 'Guest deleted'}, 202)
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from roles import roles_required
+from models import db, RateOverride, ROOM_TYPES
+from query_budget import query_budget
+from response_cache import bump_version
+from pricing import DEFAULT_MAX_QUOTES, quote_stays
+from sqlutil import upsert_insert
+
+bp = Blueprint('quotes', __name__)
+
+# Quotes and rates
+@bp.route('/quotes', methods=['POST'])
+@jwt_required()
+# The table versions, plus rooms and overrides when either has changed
+@query_budget(3)
+def create_quotes():
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        return jsonify({'error': 'Expected a JSON array of stays'}), 400
+    limit = current_app.config.get('QUOTE_MAX_ITEMS', DEFAULT_MAX_QUOTES)
+    if len(items) > limit:
+        return jsonify({'error': f'At most {limit} stays per request'}), 400
+    quotes, errors = quote_stays(items)
+    return jsonify({'quotes': quotes, 'errors': errors}), 200
+
+def _parse_override(item):
+    if not isinstance(item, dict):
+        raise ValueError('Override must be a JSON object')
+    if item.get('room_type') not in ROOM_TYPES:
+        raise ValueError('Invalid room type')
+    try:
+        day = datetime.strptime(str(item.get('date')), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('Invalid date format. Expected YYYY-MM-DD.')
+    price = item.get('price_per_night')
+    if price is not None and (not isinstance(price, int) or isinstance(price, bool) or price < 0):
+        raise ValueError('price_per_night must be a non-negative integer or null')
+    return {'day': day, 'room_type': item['room_type'], 'price_per_night': price}
+
+@bp.route('/rates/overrides', methods=['GET'])
+@jwt_required()
+@query_budget(1)
+def get_rate_overrides():
+    query = db.select(RateOverride).order_by(RateOverride.day, RateOverride.room_type)
+    try:
+        if request.args.get('start'):
+            query = query.where(RateOverride.day >= datetime.strptime(request.args['start'], '%Y-%m-%d').date())
+        if request.args.get('end'):
+            query = query.where(RateOverride.day < datetime.strptime(request.args['end'], '%Y-%m-%d').date())
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Expected YYYY-MM-DD.'}), 400
+    if request.args.get('room_type'):
+        query = query.where(RateOverride.room_type == request.args['room_type'])
+    return jsonify([
+        {'date': o.day.isoformat(), 'room_type': o.room_type, 'price_per_night': o.price_per_night}
+        for o in db.session.execute(query).scalars()
+    ]), 200
+
+@bp.route('/rates/overrides', methods=['PUT'])
+@roles_required('admin')
+def put_rate_overrides():
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        return jsonify({'error': 'Expected a JSON array of overrides'}), 400
+    try:
+        # The last entry for a date and room type wins
+        overrides = list({(o['day'], o['room_type']): o for o in map(_parse_override, items)}.values())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # A null price removes the override for that date
+    upserts = [o for o in overrides if o['price_per_night'] is not None]
+    for o in overrides:
+        if o['price_per_night'] is None:
+            db.session.execute(db.delete(RateOverride).where(
+                RateOverride.day == o['day'], RateOverride.room_type == o['room_type']))
+    if upserts:
+        stmt = upsert_insert(RateOverride)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['day', 'room_type'],
+            set_={'price_per_night': stmt.excluded.price_per_night},
+        )
+        db.session.execute(stmt, upserts)
+    bump_version('rate_overrides')
+    db.session.commit()
+    return jsonify({'updated': len(upserts), 'removed': len(overrides) - len(upserts)}), 200
@@ -0,0 +1,24 @@
+from flask import Blueprint, request, jsonify
+from roles import roles_required
+from reports import occupancy_report, parse_report_args, revenue_report
+
+bp = Blueprint('reports', __name__)
+
+# Reports
+@bp.route('/reports/occupancy', methods=['GET'])
+@roles_required('admin')
+def get_occupancy_report():
+    try:
+        start, end, group_by, room_type = parse_report_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(occupancy_report(start, end, group_by, room_type)), 200
+
+@bp.route('/reports/revenue', methods=['GET'])
+@roles_required('admin')
+def get_revenue_report():
+    try:
+        start, end, group_by, room_type = parse_report_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(revenue_report(start, end, group_by, room_type)), 200
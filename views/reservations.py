@@ -0,0 +1,82 @@
+from flask import Blueprint, request, make_response, jsonify
+from flask_jwt_extended import jwt_required
+from roles import roles_required
+from models import db, Rooms, Reservation
+from pagination import list_response
+from serializers import get_plan, plan_from_args
+from query_budget import query_budget
+from reports import record_reservations
+from response_cache import bump_version
+from booking import BookingBusy, BookingConflict, book
+from changes import record_change
+from jobs import enqueue, reservation_payload
+from bulk import ReservationImporter, bulk_import
+
+bp = Blueprint('reservations', __name__)
+
+@bp.app_errorhandler(BookingBusy)
+def booking_busy(e):
+    response = jsonify({'error': str(e)})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+# CRUD for Reservations
+@bp.route('/reservations', methods=['GET'])
+@jwt_required()
+@query_budget(1)
+def get_reservations():
+    try:
+        plan = plan_from_args(Reservation, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return list_response(Reservation, plan, db.select(Reservation).options(*plan.load_options()))
+
+@bp.route('/reservations/<int:id>', methods=['GET'])
+@jwt_required()
+@query_budget(1)
+def get_reservation(id):
+    try:
+        plan = plan_from_args(Reservation, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    reservation = db.session.get(Reservation, id, options=plan.load_options())
+    if reservation:
+        return jsonify(plan(reservation)), 200
+    return jsonify({'error': 'Reservation not found'}), 404
+
+@bp.route('/reservations', methods=['POST'])
+@roles_required('admin', 'user')
+def create_reservation():
+    data = request.get_json()
+    # print("Incoming data..",data)
+    try:
+        # Checks the room and its bookings under a per-room lock, then commits
+        new_reservation = book(data)
+        return make_response(jsonify(get_plan(Reservation)(new_reservation)), 201)
+    except BookingConflict as e:
+        return jsonify({'error': str(e)}), 409
+    except BookingBusy:
+        raise
+    except Exception as e:
+        # print("Here is the Error",str(e))
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/reservations/bulk', methods=['POST'])
+@roles_required('admin')
+def bulk_create_reservations():
+    return bulk_import(ReservationImporter(Reservation))
+
+@bp.route('/reservations/<int:id>', methods=['DELETE'])
+@roles_required('admin', 'user')
+def delete_reservation(id):
+    reservation = db.session.get(Reservation, id)
+    if not reservation:
+        return jsonify({'error': 'Reservation not found'}), 404
+    room = db.session.get(Rooms, reservation.room_id)
+    record_reservations([reservation], -1)
+    enqueue('reservation_notification', reservation_payload('cancelled', reservation, room.room_number))
+    record_change('reservations', 'deleted', {'id': reservation.id, 'room_id': reservation.room_id})
+    db.session.delete(reservation)
+    bump_version('reservations')
+    db.session.commit()
+    return make_response({'message': 'Reservation successfully deleted'}, 202)
@@ -0,0 +1,144 @@
+from flask import Blueprint, request, make_response, jsonify
+from flask_jwt_extended import jwt_required
+from roles import roles_required
+from models import db, Rooms, ROOM_STATUSES
+from pagination import list_response
+from serializers import get_plan, plan_from_args
+from query_budget import query_budget
+from availability import available_rooms_query, parse_range
+from reports import record_reservations, retype_room
+from response_cache import bump_version, cached_response
+from changes import record_change, record_changes
+from bulk import ModelImporter, bulk_import
+from room_status import HOUSEKEEPING
+
+bp = Blueprint('rooms', __name__)
+
+# CRUD for Rooms
+@bp.route('/rooms', methods=['GET'])
+@jwt_required()
+@cached_response('rooms', 'reservations', 'guests')
+@query_budget(2)
+def get_all():
+    try:
+        plan = plan_from_args(Rooms, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query = db.select(Rooms).options(*plan.load_options())
+    status = request.args.get('status')
+    if status:
+        if status not in ROOM_STATUSES:
+            return jsonify({'error': f"status must be one of {', '.join(ROOM_STATUSES)}"}), 400
+        query = query.where(Rooms.status == status)
+    return list_response(Rooms, plan, query)
+@jwt_required()
+def get_rooms():
+    rooms = Rooms.query.all()
+    response_data = [get_plan(Rooms)(room) for room in rooms]
+    return make_response(jsonify(response_data), 200)
+
+@bp.route('/rooms/available', methods=['GET'])
+@jwt_required()
+@cached_response('rooms', 'reservations')
+@query_budget(1)
+def get_available_rooms():
+    try:
+        check_in, check_out = parse_range(request.args.get('check_in'), request.args.get('check_out'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    plan = get_plan(Rooms, 'summary')
+    query = available_rooms_query(check_in, check_out, request.args.get('room_type'))
+    rooms = db.session.execute(query.options(*plan.load_options())).scalars()
+    return jsonify([plan(room) for room in rooms]), 200
+
+@bp.route('/rooms/<int:id>', methods=['GET'])
+@jwt_required()
+@cached_response('rooms', 'reservations', 'guests')
+@query_budget(2)
+def get_room(id):
+    try:
+        plan = plan_from_args(Rooms, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    room = db.session.get(Rooms, id, options=plan.load_options())
+    if room:
+        return jsonify(plan(room)), 200
+    return jsonify({'error': 'Room not found'}), 404
+
+@bp.route('/rooms', methods=['POST'])
+@roles_required('admin')
+def create_room():
+    data = request.get_json()
+    try:
+        new_room = Rooms(
+            room_number=data['room_number'],
+            room_type=data['room_type'],
+            price_per_night=data['price_per_night'],
+            status=data['status']
+        )
+        db.session.add(new_room)
+        db.session.flush()
+        record_change('rooms', 'created', get_plan(Rooms, 'summary')(new_room))
+        bump_version('rooms')
+        db.session.commit()
+        return make_response(jsonify(get_plan(Rooms)(new_room)), 201)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@bp.route('/rooms/bulk', methods=['POST'])
+@roles_required('admin')
+def bulk_create_rooms():
+    return bulk_import(ModelImporter(Rooms))
+
+@bp.route('/rooms/<int:id>', methods=['PATCH'])
+@roles_required('admin')
+def update_room(id):
+    room = db.session.get(Rooms, id)
+    if not room:
+        return jsonify({'error': 'Room not found'}), 404
+
+    data = request.get_json()
+    old_type = room.room_type
+    try:
+        for key in ('room_number', 'room_type', 'price_per_night', 'status', 'image'):
+            if key in data:
+                setattr(room, key, data[key])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if room.room_type != old_type:
+        # The rollup is kept per room type, so the room's stays move with it
+        retype_room(room.reservations, old_type, room.room_type)
+    record_change('rooms', 'updated', get_plan(Rooms, 'summary')(room))
+    bump_version('rooms')
+    db.session.commit()
+    return make_response(jsonify(get_plan(Rooms)(room)), 200)
+
+@bp.route('/rooms/<int:id>/housekeeping', methods=['POST'])
+@roles_required('admin', 'housekeeping')
+def update_housekeeping(id):
+    room = db.session.get(Rooms, id)
+    if not room:
+        return jsonify({'error': 'Room not found'}), 404
+    status = (request.get_json(silent=True) or {}).get('status')
+    if status not in HOUSEKEEPING.get(room.status, ()):
+        return jsonify({'error': f"Room is {room.status}; housekeeping can't move it to {status}"}), 409
+    room.status = status
+    record_change('rooms', 'updated', get_plan(Rooms, 'summary')(room))
+    bump_version('rooms')
+    db.session.commit()
+    return make_response(jsonify(get_plan(Rooms, 'summary')(room)), 200)
+
+@bp.route('/rooms/<int:id>', methods=['DELETE'])
+@roles_required('admin')
+def delete_room(id):
+    room = db.session.get(Rooms, id)
+    if not room:
+        return jsonify({'error': 'Room not found'}), 404
+    record_reservations(room.reservations, -1)
+    record_changes('reservations', 'deleted', [{'id': r.id, 'room_id': r.room_id} for r in room.reservations])
+    record_change('rooms', 'deleted', {'id': room.id})
+    db.session.delete(room)
+    bump_version('rooms', 'reservations')
+    db.session.commit()
+    return make_response({'message': 'room deleted successfully'}, 202)